@@ -265,23 +265,9 @@ async def signup(payload: SignupRequest) -> SignUpResponse:
             fcm_token=payload.fcm_token,
         )
 
-        await user_service.create_profile(profile_data)
-        logger.info(f"Created profile for user: {user_id}")
-
-        await user_service.create_default_preferences(user_id)
-        logger.info(f"Created default preferences for user: {user_id}")
-
-        # Generate and send email verification
-        try:
-            otp_code = await user_service.generate_email_verification_otp(user_id, payload.email)
-            await user_service.send_verification_email(
-                email=payload.email,
-                otp_code=otp_code,
-                user_name=payload.display_name
-            )
-            logger.info(f"Verification email sent to {payload.email}")
-        except Exception as e:
-            logger.warning(f"Failed to send verification email to {payload.email}: {str(e)}")
+        # Create profile and default preferences, and send email verification
+        await user_service.provision_user(profile_data)
+        logger.info(f"Created profile and default preferences for user: {user_id}")
 
         logger.info(f"User {payload.email} registered successfully")
         return SignUpResponse(
@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from fastapi import APIRouter, Depends, Request, HTTPException, status, Header, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, HTTPException, status, Header, Query
 from datetime import datetime
 
 from app.api.auth_guard import auth_guard
@@ -13,8 +14,13 @@ from app.models.billing import (
     BillingPortalResponse,
     PublishableKey,
 )
-from typing import Dict, Any, Optional
-from app.services.stripe_service import stripe_service, StripeServiceError
+from typing import Dict, Any, List, Optional, Tuple
+from app.services.stripe_service import (
+    stripe_service,
+    StripeServiceError,
+    StripeUnavailableError,
+    WebhookStoreError,
+)
 from app.services.mail_service import mail_service
 from app.services.user_service import user_service
 from app.core.config import settings
@@ -23,6 +29,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# seconds between passes re-running unfinished and dead-lettered webhook events
+WEBHOOK_REPLAY_INTERVAL = 60
+
 
 @router.get(
     "/stripe-config",
@@ -76,6 +85,8 @@ async def create_checkout_session(
 
     except HTTPException as e:
         raise
+    except StripeUnavailableError:
+        raise
     except StripeServiceError as e:
         logger.error(f"Stripe service error: {str(e)}")
         raise HTTPException(
@@ -91,36 +102,101 @@ async def create_checkout_session(
         )
 
 
-@router.post(
-    "/webhook",
-    status_code=status.HTTP_200_OK,
-    summary="Process Stripe webhook events",
-    description="Process Stripe webhook events for subscription management",
-)
-async def stripe_webhook(
-    request: Request, stripe_signature: str = Header(..., alias="Stripe-Signature")
-) -> dict:
+async def process_stripe_event(event: Dict[str, Any], attempts: int = 0) -> dict:
+    """Handle a recorded Stripe webhook event in the background.
+
+    Runs after the webhook has been acknowledged, so Stripe gets its 2xx
+    without waiting on Stripe/database round-trips. Subscription events older
+    than one already handled are resolved without dispatching. Failed events
+    are dead-lettered to webhook_failures for retry with backoff; either way
+    the event's webhook_events row is then stamped as handled. If that
+    bookkeeping fails the row is left unstamped and the event is replayed.
+
+    Args:
+        event: Verified Stripe event
+        attempts: Failed attempts recorded for this event so far
+
+    Returns:
+        Status dict describing how the event was handled
+    """
+    # an out-of-order or retried subscription event must not undo a newer one
+    if await stripe_service.is_stale_webhook_event(event):
+        logger.info(f"Event {event['id']} is older than the last handled event for its subscription, skipping")
+        result = {"status": "success", "message": f"Event {event['id']} is stale"}
+    else:
+        result = await dispatch_stripe_event(event)
     try:
-        payload = await request.body()
+        if result.get("status") == "success":
+            if attempts:
+                await stripe_service.resolve_webhook_failure(event["id"])
+        else:
+            await stripe_service.record_webhook_failure(
+                event, result.get("message", "unknown error"), attempts
+            )
+        await stripe_service.mark_webhook_event_processed(event["id"])
+    except WebhookStoreError as e:
+        # the row stays unstamped, so the replay pass runs the event again
+        logger.error(f"Could not update bookkeeping for webhook event {event['id']}: {str(e)}")
+    return result
+
+
+async def replay_stripe_events(
+    events: List[Tuple[Dict[str, Any], int]], concurrency: int = 20
+) -> List[dict]:
+    """Process a batch of stored Stripe events concurrently.
+
+    Args:
+        events: (event, failed attempts so far) pairs to re-run
+        concurrency: Maximum number of events handled at once
+
+    Returns:
+        Status dicts in the same order as events
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _process(event: Dict[str, Any], attempts: int) -> dict:
+        async with semaphore:
+            return await process_stripe_event(event, attempts)
+
+    return await asyncio.gather(
+        *(_process(event, attempts) for event, attempts in events)
+    )
+
+
+async def replay_unprocessed_stripe_events() -> None:
+    """Re-run webhook events that never finished or are due a retry.
+
+    Covers events whose background task died before handling them and
+    dead-lettered events whose backoff has elapsed.
+    """
+    if not await stripe_service.claim_webhook_replay(ttl=WEBHOOK_REPLAY_INTERVAL):
+        return
+
+    events = [
+        (event, 0) for event in await stripe_service.get_unprocessed_webhook_events()
+    ]
+    events += await stripe_service.get_due_webhook_failures()
+    if not events:
+        return
+
+    logger.info(f"Replaying {len(events)} webhook events")
+    results = await replay_stripe_events(events)
+    failed = sum(1 for result in results if result.get("status") != "success")
+    if failed:
+        logger.warning(f"{failed} of {len(events)} replayed webhook events failed")
 
-        event = stripe_service.verify_webhook_signature(payload, stripe_signature)
-        
-        # Get event ID for idempotency protection
-        event_id = event.get("id")
-        if not event_id:
-            logger.warning("Received webhook event without ID")
-            return {"status": "success", "message": "Event received but no ID found"}
-        
-        # Check if we've already processed this event
-        is_processed = await stripe_service.is_webhook_event_processed(event_id)
-        if is_processed:
-            logger.info(f"Event {event_id} already processed, skipping")
-            return {"status": "success", "message": f"Event {event_id} already processed"}
-        
-        # Mark event as being processed
-        await stripe_service.mark_webhook_event_processed(event_id)
-        logger.info(f"Processing webhook event: {event['type']} (ID: {event_id})")
 
+async def dispatch_stripe_event(event: Dict[str, Any]) -> dict:
+    """Dispatch a verified Stripe webhook event to its handler.
+
+    Args:
+        event: Verified Stripe event
+
+    Returns:
+        Status dict describing how the event was handled
+    """
+    event_id = event.get("id")
+    try:
         if event["type"] == "setup_intent.succeeded":
             session = event["data"]["object"]
             payment_method = session["payment_method"]
@@ -147,7 +223,8 @@ async def stripe_webhook(
                 customer_id=customer_id,
                 payment_method_id=payment_method,
                 user_id=user_id,
-                plan=plan
+                plan=plan,
+                setup_intent_id=session["id"],
             )
             
             logger.info(f"Subscription creation process initiated for user: {customer_id}")
@@ -206,6 +283,7 @@ async def stripe_webhook(
                 
             )
             logger.info(f"Subscription details updated for user: {customer_id}")
+            await stripe_service.cache_subscription_from_event(session)
 
             # only send a welcome email if this is the customer's only active subscription.
             try:
@@ -376,9 +454,73 @@ async def stripe_webhook(
                 
             return {"status": "success", "message": f"Subscription status updated: {subscription_status}"}
 
+        elif event["type"] in ("customer.updated", "customer.deleted"):
+            customer = event["data"]["object"]
+            stripe_service.invalidate_customer_email(customer["id"])
+            return {"status": "success", "message": f"Customer cache refreshed: {customer['id']}"}
+
         logger.info(f"Unhandled event type: {event['type']}")
         return {"status": "success", "message": f"Event received: {event['type']}"}
 
+    except StripeServiceError as e:
+        logger.error(f"Stripe webhook error for event {event_id}: {str(e)}")
+        # the event was already acknowledged to Stripe; just record the failure
+        return {"status": "error", "message": f"Webhook processing error: {str(e)}"}
+    except Exception as e:
+        logger.error(f"Unexpected error processing webhook event {event_id}: {str(e)}")
+        return {"status": "error", "message": "An unexpected error occurred"}
+
+
+@router.post(
+    "/webhook",
+    status_code=status.HTTP_200_OK,
+    summary="Process Stripe webhook events",
+    description="Process Stripe webhook events for subscription management",
+)
+async def stripe_webhook(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    stripe_signature: str = Header(..., alias="Stripe-Signature"),
+) -> dict:
+    try:
+        payload = await request.body()
+
+        event = stripe_service.verify_webhook_signature(payload, stripe_signature)
+        
+        # Get event ID for idempotency protection
+        event_id = event.get("id")
+        if not event_id:
+            logger.warning("Received webhook event without ID")
+            return {"status": "success", "message": "Event received but no ID found"}
+        
+        # Check if we've already processed this event, falling back to the
+        # webhook_events table when the Redis claim is unavailable
+        claimed = await stripe_service.claim_webhook_event(event_id)
+        if claimed is None:
+            claimed = not await stripe_service.is_webhook_event_processed(event_id)
+        if not claimed:
+            logger.info(f"Event {event_id} already processed, skipping")
+            return {"status": "success", "message": f"Event {event_id} already processed"}
+
+        # Persist the event before acknowledging it, so it can be replayed if
+        # background processing doesn't complete. Without the row it must not
+        # be acknowledged: release the claim and fail so Stripe redelivers it
+        try:
+            await stripe_service.record_webhook_event(event)
+        except WebhookStoreError as e:
+            await stripe_service.release_webhook_event(event_id)
+            logger.error(f"Could not record webhook event {event_id}, asking Stripe to redeliver: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Webhook event could not be recorded",
+            )
+        logger.info(f"Processing webhook event: {event['type']} (ID: {event_id})")
+
+        background_tasks.add_task(process_stripe_event, event)
+        return {"status": "success", "message": f"Event {event_id} received"}
+
+    except HTTPException:
+        raise
     except StripeServiceError as e:
         logger.error(f"Stripe webhook error for event {event_id if 'event_id' in locals() else 'unknown'}: {str(e)}")
         # Still return 200 to prevent Stripe retries for permanent failures
@@ -420,6 +562,8 @@ async def cancel_subscription(
                 user_id=user_id, cancel_at_period_end=False
             )
 
+    except StripeUnavailableError:
+        raise
     except StripeServiceError as e:
         logger.error(f"Stripe service error: {str(e)}")
         raise HTTPException(
@@ -505,6 +649,8 @@ async def create_setup_intent(
 
     except HTTPException as e:
         raise
+    except StripeUnavailableError:
+        raise
     except Exception as e:
         logger.info(
             f"An unexpected error occured while creating setup intent: {str(e)}"
@@ -534,6 +680,8 @@ async def create_customer_portal_session(
             user_id=user_id, customer_id=customer_id
         )
         return BillingPortalResponse(url=portal_url)
+    except StripeUnavailableError:
+        raise
     except Exception as e:
         logger.info(
             f"An unexpected error occured while creating billing portal session for user: {user_id} with error: {str(e)}"
@@ -572,6 +720,8 @@ async def get_subscription_details(
         
         return SubscriptionDetails(**subscription_details)
         
+    except StripeUnavailableError:
+        raise
     except StripeServiceError as e:
         logger.error(f"Stripe service error getting subscription details: {str(e)}")
         raise HTTPException(
@@ -620,6 +770,8 @@ async def reactivate_subscription(
             cancel_at_period_end=subscription.cancel_at_period_end
         )
         
+    except StripeUnavailableError:
+        raise
     except StripeServiceError as e:
         logger.error(f"Stripe service error reactivating subscription: {str(e)}")
         
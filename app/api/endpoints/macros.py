@@ -43,7 +43,7 @@ async def macros_setup_endpoint(
         if request.manual_macros:
             response = MacroCalculatorResponse(**request.manual_macros.model_dump())
             # Save the manually entered macros to user preferences
-            macros_service.save_user_preferences(user_id, response)
+            await macros_service.save_user_preferences(user_id, response)
             return response
         
         target_weight = request.target_weight if request.target_weight else request.weight
@@ -103,7 +103,7 @@ async def macros_setup_endpoint(
             macro_response.time_to_goal = TimeToGoal(**time_calculation)
 
         # Save the calculated macros
-        macros_service.save_user_preferences(user_id, macro_response)
+        await macros_service.save_user_preferences(user_id, macro_response)
 
         user_data = {
             "age": request.age,
@@ -174,7 +174,7 @@ async def adjust_macro_distribution(
         )
 
         # Save the adjusted macros to user preferences
-        macros_service.save_user_preferences(user_id, macro_response)
+        await macros_service.save_user_preferences(user_id, macro_response)
 
         return macro_response
 
@@ -128,10 +128,9 @@ async def update_user_profile(
         if avatar:
             if not avatar.content_type or not avatar.content_type.startswith("image/"):
                 raise HTTPException(status_code=400, detail="Only image files allowed.")
-            file_content = await avatar.read()
             content_type = avatar.content_type or "image/jpeg"
             avatar_url = await user_service.upload_user_avatar(
-                user_id=user_id, file_content=file_content, content_type=content_type
+                user_id=user_id, file_stream=avatar.file, content_type=content_type
             )
             await avatar.close()
             user_data = UpdateUserProfileRequest(
@@ -330,6 +329,7 @@ async def update_user_preferences(
                     detail="Failed to update user preferences",
                 )
 
+            user_service.invalidate_user_cache(user_id)
             updated_preferences = response.json()
 
             if not updated_preferences:
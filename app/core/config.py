@@ -28,6 +28,8 @@ class Settings:
         self.SUPABASE_URL = os.getenv("SUPABASE_URL")
         self.SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
         self.SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+        # transaction pooler connection string; enables direct reads via asyncpg
+        self.SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL")
 
 
 
@@ -50,9 +52,17 @@ class Settings:
         # Stripe API Settings
         self.STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
         self.STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
+        # comma-separated signing secrets, e.g. for Connect endpoints or rotation
+        self.STRIPE_WEBHOOK_SECRETS = [
+            secret.strip()
+            for secret in os.getenv("STRIPE_WEBHOOK_SECRETS", "").split(",")
+            if secret.strip()
+        ]
         self.STRIPE_MONTHLY_PRICE_ID = os.getenv("STRIPE_MONTHLY_PRICE_ID")
         self.STRIPE_YEARLY_PRICE_ID = os.getenv("STRIPE_YEARLY_PRICE_ID")
         self.STRIPE_PUBLISHABLE_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY")
+        # defaults to the version the installed SDK is built against
+        self.STRIPE_API_VERSION = os.getenv("STRIPE_API_VERSION")
 
         # AWS SETTINGS
         self.AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
@@ -74,6 +84,9 @@ class Settings:
         self.REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
         self.REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 
+        # Worker threads for blocking I/O (database client, sync routes)
+        self.THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", 100))
+
         # Email Settings
         self.EMAIL_SENDER = os.environ.get("EMAIL_SENDER", "support@macromealsapp.com")
         self.EMAIL_SENDER_NAME = os.environ.get("EMAIL_SENDER_NAME", "MacroMeals")
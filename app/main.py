@@ -7,6 +7,9 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+import anyio.to_thread
+import asyncio
 import uvicorn
 
 
@@ -26,8 +29,12 @@ from app.api.endpoints import (
     contact,
 )
 from app.core.config import settings
+from app.services.base_database_service import get_database_service
+from app.services.stripe_service import StripeUnavailableError, stripe_service
+from app.services.user_service import user_service
 from app.tasks.macromeals_tasks import macromeals_tasks
 from app.utils.cloudwatch_middleware import CloudWatchLoggingMiddleware
+from app.utils.request_cache import RequestCacheMiddleware
 import logging
 import json
 
@@ -86,11 +93,49 @@ scheduler.add_job(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # size the pools used for blocking I/O: asyncio.to_thread calls and
+    # anyio for sync route handlers
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.THREADPOOL_SIZE)
+    )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = (
+        settings.THREADPOOL_SIZE
+    )
+
+    # refuse to serve Stripe webhooks that could not be recorded for replay
+    await stripe_service.check_webhook_schema()
+    # connect to Supabase in the background so the first request skips the handshake
+    warm_up = asyncio.create_task(user_service.warm_up())
     # start scheduler
     scheduler.start()
+    # webhook replay shares the app's event loop with the Stripe and Redis clients
+    webhook_replay = asyncio.create_task(
+        run_periodically(
+            billing.replay_unprocessed_stripe_events,
+            billing.WEBHOOK_REPLAY_INTERVAL,
+        )
+    )
     yield
+    warm_up.cancel()
+    webhook_replay.cancel()
+    # let a replay pass in flight unwind before its clients are closed
+    await asyncio.gather(warm_up, webhook_replay, return_exceptions=True)
     # shut down scheduler
     scheduler.shutdown()
+    # close pooled database, Supabase API and Stripe connections
+    await get_database_service().aclose()
+    await user_service.close()
+    await stripe_service.close()
+
+
+async def run_periodically(job: Callable, interval: float) -> None:
+    """Await job every interval seconds, logging rather than raising failures."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await job()
+        except Exception as e:
+            logger.error(f"Periodic job {job.__name__} failed: {e}")
 
 
 def custom_openapi():
@@ -153,6 +198,9 @@ app.add_middleware(
     batch_timeout=30
 )
 
+# per-request memo for database reads
+app.add_middleware(RequestCacheMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -221,6 +269,17 @@ async def root():
     return {"status": "online", "service": settings.PROJECT_NAME}
 
 
+@app.exception_handler(StripeUnavailableError)
+async def stripe_unavailable_handler(request: Request, exc: StripeUnavailableError):
+    logger.warning(f"Stripe unavailable: {str(exc)}")
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": "Billing is temporarily unavailable, please try again shortly"
+        },
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request):
     return JSONResponse(
@@ -76,4 +76,9 @@ class SubscriptionReactivationResponse(BaseModel):
 
 
 class PublishableKey(BaseModel):
-    publishable_key: str
\ No newline at end of file
+    publishable_key: str
+
+
+class VerifiedPayload(BaseModel):
+    """Raw Stripe webhook body whose signature has been verified."""
+    body: str = Field(..., description="Decoded webhook request body")
@@ -1,4 +1,5 @@
-from typing import List, Type, Any, Optional, Union
+from functools import lru_cache
+from typing import Dict, List, Type, Any, Optional, Union
 
 
 class BaseDatabaseService:
@@ -29,7 +30,7 @@ class BaseDatabaseService:
         if cls is not BaseDatabaseService:
             BaseDatabaseService.subclasses.append(cls)
 
-    def update_data(self, table_name: str, data: Optional[Any], **kwargs) -> Any:
+    async def update_data(self, table_name: str, data: Optional[Any], **kwargs) -> Any:
         """
         Updates a record in the specified table.
 
@@ -49,7 +50,7 @@ class BaseDatabaseService:
         cls_name = type(self).__name__
         raise NotImplementedError(f"{cls_name}.update_data not implemented")
 
-    def insert_data(self, table_name: str, data: Any, **kwargs) -> Any:
+    async def insert_data(self, table_name: str, data: Any, **kwargs) -> Any:
         """
         Inserts a new record into the specified table.
 
@@ -58,7 +59,8 @@ class BaseDatabaseService:
 
         Args:
             table_name (str): The name of the table to insert into.
-            data (Any): The data for the new record.
+            data (Any): The data for the new record, or a list of records to
+                        insert in a single request.
             **kwargs: Additional keyword arguments that might be specific
                       to the underlying database implementation.
 
@@ -69,7 +71,7 @@ class BaseDatabaseService:
         cls_name = type(self).__name__
         raise NotImplementedError(f"{cls_name}.insert_data not implemented")
 
-    def delete_data(self, table_name: str) -> Any:
+    async def delete_data(self, table_name: str) -> Any:
         """
         Deletes one or more records from the specified table.
 
@@ -88,7 +90,26 @@ class BaseDatabaseService:
         cls_name = type(self).__name__
         raise NotImplementedError(f"{cls_name}.delete_data not implemented")
 
-    def select_data(self, table_name: str, **kwargs) -> Any:
+    async def delete_many(self, table_name: str, column: str, values: List[Any]) -> Any:
+        """
+        Deletes every record whose column value is one of values.
+
+        This is a default stub method that must be overridden by concrete
+        subclasses to delete all matching records in a single operation.
+
+        Args:
+            table_name (str): The name of the table to delete from.
+            column (str): The column to filter on.
+            values (List[Any]): The values of column whose records are deleted.
+
+        Raises:
+            NotImplementedError: If this method is called directly from the
+                                 BaseDatabaseService class.
+        """
+        cls_name = type(self).__name__
+        raise NotImplementedError(f"{cls_name}.delete_many not implemented")
+
+    async def select_data(self, table_name: str, **kwargs) -> List[Dict[str, Any]]:
         """
         Selects records from the specified table based on provided criteria.
 
@@ -101,6 +122,10 @@ class BaseDatabaseService:
                       (e.g., conditions, filters, joins), which will be
                       specific to the underlying database implementation.
 
+        Returns:
+            List[Dict[str, Any]]: The matching rows, one dict per row. Always
+                                  a list, empty when nothing matched.
+
         Raises:
             NotImplementedError: If this method is called directly from the
                                  BaseDatabaseService class.
@@ -108,7 +133,7 @@ class BaseDatabaseService:
         cls_name = type(self).__name__
         raise NotImplementedError(f"{cls_name}.select_data not implemented")
 
-    def rpc(self, function_name: str, params: Optional[dict] = None, **kwargs) -> Any:
+    async def rpc(self, function_name: str, params: Optional[dict] = None, **kwargs) -> Any:
         """
         Calls a stored procedure or function in the database.
 
@@ -130,3 +155,25 @@ class BaseDatabaseService:
         """
         cls_name = type(self).__name__
         raise NotImplementedError(f"{cls_name}.rpc not implemented")
+
+    async def aclose(self) -> None:
+        """
+        Releases connections held by the implementation. No-op by default.
+        """
+        pass
+
+
+@lru_cache(maxsize=1)
+def get_database_service() -> BaseDatabaseService:
+    """
+    Returns the process-wide instance of the registered database implementation.
+
+    The instance is created on first use and shared afterwards, so the
+    underlying client and its connection pool are reused across calls.
+
+    Raises:
+        RuntimeError: If no BaseDatabaseService subclass has been registered.
+    """
+    if not BaseDatabaseService.subclasses:
+        raise RuntimeError("No database service implementation available")
+    return BaseDatabaseService.subclasses[0]()
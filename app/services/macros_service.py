@@ -10,7 +10,11 @@ from app.models.macro_tracking import (
     MacroCalculatorResponse,
 )
 from app.models.user import HeightUnitPreference, WeightUnitPreference
-from app.services.base_database_service import BaseDatabaseService
+from app.services.base_database_service import (
+    BaseDatabaseService,
+    get_database_service,
+)
+from app.services.user_service import user_service
 from app.utils.constants import FEET_TO_CM, LBS_TO_KG, CALORIES_PER_KG, PROTEIN_PER_KG, FAT_PER_KG, PROTEIN_CALS_PER_GRAM, FAT_CALS_PER_GRAM, CARB_CALS_PER_GRAM, MIN_CARBS_GRAMS
 
 logger = logging.getLogger(__name__)
@@ -335,7 +339,7 @@ class MacrosService:
             logger.error(f"Error adjusting macro distribution: {str(e)}")
             raise MacrosServiceError(f"Error adjusting macro distribution: {str(e)}")
 
-    def save_user_preferences(
+    async def save_user_preferences(
         self, user_id: str, macro_targets: MacroCalculatorResponse
     ) -> Dict[str, Any]:
         """
@@ -353,7 +357,7 @@ class MacrosService:
         """
         try:
             # Check if user already has preferences
-            existing_prefs = self._get_user_preferences(user_id)
+            existing_prefs = await self._get_user_preferences(user_id)
 
             now = datetime.now().isoformat()
 
@@ -373,7 +377,7 @@ class MacrosService:
 
             # If user already has preferences, update them
             if existing_prefs:
-                result = BaseDatabaseService.subclasses[0]().update_data(
+                result = await get_database_service().update_data(
                     table_name="user_preferences",
                     data=preferences_data,
                     cols={"user_id": user_id},
@@ -381,16 +385,18 @@ class MacrosService:
             # Otherwise, insert new preferences
             else:
                 preferences_data["created_at"] = now
-                result = BaseDatabaseService.subclasses[0]().insert_data(
+                result = await get_database_service().insert_data(
                     table_name="user_preferences", data=preferences_data
                 )
 
-            # Update the user profile to indicate they have macros set
-            BaseDatabaseService.subclasses[0]().update_data(
+            # Update the user profile to indicate they have macros set, only
+            # once the preferences row is saved
+            await get_database_service().update_data(
                 table_name="user_profiles",
                 data={"has_macros": True, "updated_at": now},
                 cols={"id": user_id},
             )
+            user_service.invalidate_user_cache(user_id)
 
             return result
 
@@ -398,7 +404,7 @@ class MacrosService:
             logger.error(f"Error saving user preferences: {str(e)}")
             raise MacrosServiceError(f"Error saving user preferences: {str(e)}")
 
-    def _get_user_preferences(self, user_id: str) -> Optional[Dict[str, Any]]:
+    async def _get_user_preferences(self, user_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a user's preferences from the database.
 
@@ -409,7 +415,7 @@ class MacrosService:
             Dictionary with the user's preferences or None if not found
         """
         try:
-            result = BaseDatabaseService.subclasses[0]().select_data(
+            result = await get_database_service().select_data(
                 table_name="user_preferences", cols={"user_id": user_id}
             )
 
@@ -421,7 +427,7 @@ class MacrosService:
             logger.error(f"Error retrieving user preferences: {str(e)}")
             return None
 
-    def get_user_preferences(self, user_id: str) -> Optional[Dict[str, Any]]:
+    async def get_user_preferences(self, user_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a user's preferences from the database.
 
@@ -435,7 +441,7 @@ class MacrosService:
             MacrosServiceError: If there's an error retrieving the preferences
         """
         try:
-            return self._get_user_preferences(user_id)
+            return await self._get_user_preferences(user_id)
         except Exception as e:
             logger.error(f"Error retrieving user preferences: {str(e)}")
             raise MacrosServiceError(f"Error retrieving user preferences: {str(e)}")
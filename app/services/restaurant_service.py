@@ -1,6 +1,9 @@
 from typing import List, Dict, Any, Optional
 import logging
-from app.services.base_database_service import BaseDatabaseService
+from app.services.base_database_service import (
+    BaseDatabaseService,
+    get_database_service,
+)
 from app.services.location_service import location_service
 from app.tasks.scraping_tasks import scrape_restaurants_task
 
@@ -29,7 +32,7 @@ class RestaurantService:
 
 
     
-    def get_restaurants_within_radius(
+    async def get_restaurants_within_radius(
         self,
         latitude: float, 
         longitude: float, 
@@ -49,7 +52,7 @@ class RestaurantService:
             List of restaurant data dictionaries
         """
         try:
-            response = BaseDatabaseService.subclasses[0]().rpc(
+            response = await get_database_service().rpc(
             "find_restaurants_within_radius", 
             {
                 "lat": latitude,
@@ -95,7 +98,7 @@ class RestaurantService:
                 search_radius = await location_service.determine_search_radius(location_data=location_data)
 
 
-            restaurants = self.get_restaurants_within_radius(
+            restaurants = await self.get_restaurants_within_radius(
                 latitude, longitude, search_radius)
             logger.info(f"Found {len(restaurants)} restaurants for location '{location}'")
 
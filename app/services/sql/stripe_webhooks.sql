@@ -0,0 +1,43 @@
+-- Supabase schema for Stripe webhook bookkeeping in app/services/stripe_service.py.
+--
+-- Apply with the Supabase SQL editor or psql before deploying code that uses
+-- it; every statement is idempotent, so it is safe to run again. At startup
+-- StripeService.check_webhook_schema refuses to run without these tables and
+-- columns instead of silently losing events.
+
+-- Every received event, recorded before it is acknowledged to Stripe and
+-- stamped with processed_at once handled; unstamped rows are replayed.
+create table if not exists public.webhook_events (
+    id bigint generated by default as identity primary key,
+    event_id text not null,
+    processed_at timestamptz,
+    created_at timestamptz not null default now()
+);
+
+alter table public.webhook_events add column if not exists event_type text;
+alter table public.webhook_events add column if not exists payload jsonb;
+alter table public.webhook_events alter column processed_at drop not null;
+
+-- recording ignores duplicates on event_id, which needs a unique index;
+-- remove duplicate event_id rows left by older code before creating it
+create unique index if not exists webhook_events_event_id_key
+    on public.webhook_events (event_id);
+
+create index if not exists webhook_events_unprocessed_idx
+    on public.webhook_events (created_at)
+    where processed_at is null;
+
+-- Events whose handler failed, retried with backoff until next_retry_at is
+-- cleared after WEBHOOK_MAX_ATTEMPTS; rows are deleted once a retry succeeds.
+create table if not exists public.webhook_failures (
+    event_id text primary key,
+    payload jsonb not null,
+    attempts integer not null default 0,
+    next_retry_at timestamptz,
+    last_error text,
+    created_at timestamptz not null default now()
+);
+
+create index if not exists webhook_failures_next_retry_at_idx
+    on public.webhook_failures (next_retry_at)
+    where next_retry_at is not null;
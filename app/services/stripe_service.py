@@ -2,25 +2,131 @@
 Handles Stripe API interactions for billing, subscriptions and customer management.
 """
 
+import asyncio
+import hashlib
+import hmac
+from functools import lru_cache
 import logging
+import random
+import ssl
 from fastapi import status
 from fastapi.exceptions import HTTPException
-import os
 import stripe
-from typing import Dict, Any, List, Literal, Optional
 import time
+from types import MappingProxyType
+from typing import Awaitable, Callable, Dict, Any, List, Literal, Optional, Tuple
 from datetime import datetime, timezone
 import httpx
+import orjson
+import redis.asyncio as redis
 
-from app.models.billing import CheckoutSessionResponse
-from app.utils.helper_functions import remove_null_values
-from app.services.base_database_service import BaseDatabaseService
-from app.services.user_service import user_service
+from app.models.billing import CheckoutSessionResponse, VerifiedPayload
+from app.services.base_database_service import get_database_service
+from app.services.user_service import REST_PATH, RETURN_MINIMAL, user_service
 from app.core.config import settings
+from app.utils.circuit_breaker import CircuitBreaker, CircuitBreakerError
+from app.utils.ttl_cache import TTLCache
 
 
 logger = logging.getLogger(__name__)
 
+# seconds a customer's trial subscription lookup is served from Redis
+SUBSCRIPTION_CACHE_TTL = 300
+# seconds webhook dedupe keys are kept; covers Stripe's 3-day retry window
+WEBHOOK_EVENT_TTL = 259200
+# KEYS[1]: last handled event time of a subscription, ARGV: event time, ttl.
+# Returns 1 if a newer event was handled, else records the time; one atomic
+# step so concurrent deliveries can't both pass or move the time backwards
+LAST_SUBSCRIPTION_EVENT_SCRIPT = """
+local last = tonumber(redis.call('GET', KEYS[1]))
+if last and last > tonumber(ARGV[1]) then
+    return 1
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 0
+"""
+# seconds a customer's email is served from process memory
+CUSTOMER_EMAIL_CACHE_TTL = 3600
+# seconds a user's Stripe customer id is served from process memory
+STRIPE_CUSTOMER_CACHE_TTL = 300
+# dead-lettered webhook retries: base delay, delay cap and attempt limit
+WEBHOOK_RETRY_BASE_DELAY = 60
+WEBHOOK_RETRY_MAX_DELAY = 21600
+WEBHOOK_MAX_ATTEMPTS = 8
+
+# Supabase tables for webhook bookkeeping, relative to the shared client's base_url;
+# their schema ships in WEBHOOK_SCHEMA_SQL
+WEBHOOK_EVENTS_PATH = f"{REST_PATH}/webhook_events"
+WEBHOOK_FAILURES_PATH = f"{REST_PATH}/webhook_failures"
+# upsert on the conflicting row instead of failing, without returning it
+MERGE_DUPLICATES = MappingProxyType(
+    {"Prefer": "resolution=merge-duplicates,return=minimal"}
+)
+# insert unless the row already exists, without returning it
+IGNORE_DUPLICATES = MappingProxyType(
+    {"Prefer": "resolution=ignore-duplicates,return=minimal"}
+)
+WEBHOOK_SCHEMA_SQL = "app/services/sql/stripe_webhooks.sql"
+# columns the webhook helpers read and write, per table
+WEBHOOK_SCHEMA = MappingProxyType(
+    {
+        WEBHOOK_EVENTS_PATH: "event_id,event_type,payload,processed_at,created_at",
+        WEBHOOK_FAILURES_PATH: "event_id,payload,attempts,next_retry_at,last_error",
+    }
+)
+# seconds the startup schema check waits for Supabase
+WEBHOOK_SCHEMA_CHECK_TIMEOUT = 5.0
+
+# pin the API version explicitly; the code reads item-level period fields, so
+# it must not drift with the account default
+STRIPE_API_VERSION = settings.STRIPE_API_VERSION or stripe.api_version
+# let the SDK retry transient network/5xx errors; safe for mutating calls since
+# the SDK sends the same idempotency key on every retry of a request
+STRIPE_MAX_NETWORK_RETRIES = 3
+
+# checkout session params shared by every plan and user
+_CHECKOUT_BASE = MappingProxyType(
+    {
+        "payment_method_types": ["card"],
+        "mode": "subscription",
+        "success_url": "https://macromealsapp.com/success?session_id={CHECKOUT_SESSION_ID}",
+        "cancel_url": "https://macromealsapp.com/cancel",
+    }
+)
+
+
+def _utc_isoformat(timestamp: int) -> str:
+    """Format a Stripe epoch timestamp as a UTC ISO-8601 string."""
+    return time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(timestamp))
+
+
+class _HTTP2StripeHTTPClient(stripe.HTTPXClient):
+    """Stripe HTTPX transport whose shared async pool keeps connections alive
+    and negotiates HTTP/2, so concurrent API calls reuse one TLS connection.
+
+    Relies on the internals of stripe==12.0.0's HTTPXClient, which sends every
+    async request through self._client_async and sets self._verify_ssl_certs;
+    re-check this class when upgrading stripe.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # the parent's unused client is kept so close_async can release it
+        self._default_client_async = self._client_async
+        self._client_async = httpx.AsyncClient(
+            http2=True,
+            verify=(
+                ssl.create_default_context(cafile=stripe.ca_bundle_path)
+                if self._verify_ssl_certs
+                else False
+            ),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        )
+
+    async def close_async(self):
+        await self._default_client_async.aclose()
+        await super().close_async()
+
 
 class StripeServiceError(Exception):
     """Custom exception for Stripe service operations."""
@@ -28,21 +134,41 @@ class StripeServiceError(Exception):
     pass
 
 
+class StripeUnavailableError(StripeServiceError):
+    """Raised without calling Stripe while its circuit breaker is open."""
+
+    pass
+
+
+class WebhookStoreError(StripeServiceError):
+    """Raised when webhook bookkeeping in Supabase could not be written or read."""
+
+    pass
+
+
 class StripeService:
     """Service for managing Stripe billing and subscriptions."""
 
     def __init__(self):
         """Initialize with Stripe API credentials and configuration."""
-        stripe.api_key = settings.STRIPE_SECRET_KEY
         self.webhook_secret = settings.STRIPE_WEBHOOK_SECRET
+        self.webhook_secrets = settings.STRIPE_WEBHOOK_SECRETS or (
+            [self.webhook_secret] if self.webhook_secret else []
+        )
+        self._last_webhook_secret: Optional[str] = None
+        # keyed HMAC state per secret; copied per webhook instead of re-keying
+        self._hmac_templates: Dict[str, "hmac.HMAC"] = {
+            secret: hmac.new(secret.encode(), digestmod=hashlib.sha256)
+            for secret in self.webhook_secrets
+        }
         self.monthly_price_id = settings.STRIPE_MONTHLY_PRICE_ID
         self.yearly_price_id = settings.STRIPE_YEARLY_PRICE_ID
 
-        if not stripe.api_key:
+        if not settings.STRIPE_SECRET_KEY:
             logger.error("STRIPE_SECRET_KEY environment variable is not set")
             raise ValueError("STRIPE_SECRET_KEY environment variable is not set")
 
-        if not self.webhook_secret:
+        if not self.webhook_secrets:
             logger.warning("STRIPE_WEBHOOK_SECRET environment variable is not set")
 
         if not self.monthly_price_id or not self.yearly_price_id:
@@ -53,6 +179,140 @@ class StripeService:
                 "STRIPE_MONTHLY_PRICE_ID or STRIPE_YEARLY_PRICE_ID environment variable is not set"
             )
 
+        # checkout session params per plan; only the per-user fields are filled
+        # in on each request
+        self._checkout_template = {
+            plan: MappingProxyType(
+                {**_CHECKOUT_BASE, "line_items": [{"price": price_id, "quantity": 1}]}
+            )
+            for plan, price_id in (
+                ("monthly", self.monthly_price_id),
+                ("yearly", self.yearly_price_id),
+            )
+        }
+
+        # client used for all API calls, carrying its own key and settings
+        # instead of the stripe module globals; its *_async methods perform
+        # non-blocking HTTP so Stripe round-trips don't stall the event loop
+        self._http_client = _HTTP2StripeHTTPClient(timeout=30)
+        self.client = stripe.StripeClient(
+            settings.STRIPE_SECRET_KEY,
+            stripe_version=STRIPE_API_VERSION,
+            max_network_retries=STRIPE_MAX_NETWORK_RETRIES,
+            http_client=self._http_client,
+        )
+
+        # cache for Stripe lookups; every access fails open to Stripe
+        self.redis = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            decode_responses=True,
+            socket_connect_timeout=1,
+            socket_timeout=1,
+        )
+        self._record_subscription_event = self.redis.register_script(
+            LAST_SUBSCRIPTION_EVENT_SCRIPT
+        )
+        self._customer_email_cache = TTLCache(
+            maxsize=1024, ttl=CUSTOMER_EMAIL_CACHE_TTL
+        )
+        # user id -> Stripe customer id
+        self._stripe_customer_cache = TTLCache(
+            maxsize=10000, ttl=STRIPE_CUSTOMER_CACHE_TTL
+        )
+
+        # one breaker per Stripe resource so an outage in one API doesn't
+        # fail fast calls to the others; only connectivity and 5xx errors count
+        self._breakers = {
+            resource: CircuitBreaker(
+                f"stripe:{resource}",
+                fail_max=5,
+                reset_timeout=30,
+                failure_exceptions=(stripe.APIConnectionError, stripe.APIError),
+            )
+            for resource in (
+                "checkout",
+                "customer",
+                "subscription",
+                "setup_intent",
+                "billing_portal",
+            )
+        }
+        # bulkheads: cap in-flight calls per resource so a slow API can't tie
+        # up every connection and stall calls to the others
+        self._bulkheads = {
+            resource: asyncio.Semaphore(limit)
+            for resource, limit in (
+                ("checkout", 40),
+                ("customer", 20),
+                ("subscription", 20),
+                ("setup_intent", 20),
+                ("billing_portal", 20),
+            )
+        }
+
+    async def close(self) -> None:
+        """Close the pooled connections of the Stripe HTTP client."""
+        await self._http_client.close_async()
+
+    async def _stripe_call(
+        self, resource: str, method: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> Any:
+        """Call a Stripe client method through the resource's bulkhead and breaker.
+
+        Args:
+            resource: Breaker name, e.g. "checkout" or "subscription"
+            method: Async StripeClient service method
+            *args: Positional arguments for method
+            **kwargs: Keyword arguments for method
+
+        Returns:
+            The Stripe method's result
+
+        Raises:
+            StripeUnavailableError: If the breaker for resource is open
+        """
+        action = method.__name__.removesuffix("_async")
+        result = "ok"
+        started = time.perf_counter()
+        try:
+            async with self._bulkheads[resource]:
+                started = time.perf_counter()
+                return await self._breakers[resource].call(method, *args, **kwargs)
+        except CircuitBreakerError:
+            result = "open"
+            logger.warning("Skipping Stripe %s call, circuit is open", resource)
+            raise StripeUnavailableError(
+                f"Stripe {resource} API temporarily unavailable"
+            )
+        except Exception:
+            result = "error"
+            raise
+        finally:
+            # key=value pairs so CloudWatch Insights can parse and percentile them
+            logger.info(
+                "stripe_call resource=%s action=%s result=%s duration_ms=%.1f",
+                resource,
+                action,
+                result,
+                (time.perf_counter() - started) * 1000,
+            )
+
+    @staticmethod
+    def _idempotency_key(operation: str, user_id: str, nonce: str) -> str:
+        """Build a stable Stripe idempotency key for a logical operation.
+
+        Args:
+            operation: Name of the mutating operation (e.g. "checkout")
+            user_id: Internal user ID or Stripe customer ID the call is for
+            nonce: Value distinguishing separate logical requests
+
+        Returns:
+            32 character hex idempotency key
+        """
+        raw = f"{operation}:{user_id}:{nonce}".encode()
+        return hashlib.sha256(raw).hexdigest()[:32]
+
     async def create_checkout_session(
         self, email: str, user_id: str, plan: Literal["monthly", "yearly"] = "monthly"
     ) -> CheckoutSessionResponse:
@@ -71,72 +331,72 @@ class StripeService:
             HTTPException: If user already has payment details or active subscription
         """
         try:
-            logger.info(f"Creating checkout session for user: {user_id}")
+            logger.info("Creating checkout session for user: %s", user_id)
+
+            # read the profile row once for the subscription, customer and
+            # trial checks below
+            profile = await self._get_user_profile_row(user_id)
+            if not profile:
+                raise StripeServiceError(f"User profile not found for user {user_id}")
 
             # Check for active subscription
-            has_active_sub = await self.has_active_subscription(user_id)
+            has_active_sub = await self.has_active_subscription(
+                user_id, user_data=profile
+            )
             if has_active_sub:
                 logger.warning(
-                    f"User {user_id} attempted to create checkout session with existing active subscription"
+                    "User %s attempted to create checkout session with existing active subscription",
+                    user_id,
                 )
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="You already have an active subscription. Please manage your existing subscription in your account settings.",
                 )
 
-            # get stripe customer id if exists (for trial check)
-            customer = await self.get_stripe_customer(user_id=user_id)
+            # get stripe customer id if exists
+            customer = profile.get("stripe_customer_id")
 
             # Create customer if it doesn't exist
             if not customer:
-                logger.info(f"Creating new Stripe customer for user: {user_id}")
+                logger.info("Creating new Stripe customer for user: %s", user_id)
                 customer = await self.create_stripe_customer(
                     user_id=user_id, email=email
                 )
-                logger.info(f"Created Stripe customer: {customer}")
+                logger.info("Created Stripe customer: %s", customer)
 
             # Check if user has already used their trial
-            user_profile = await user_service.get_user_profile(user_id)
-            has_used_trial = user_profile.has_used_trial
+            has_used_trial = bool(profile.get("has_used_trial"))
 
+            metadata = {
+                "user_id": user_id,
+                "has_trial": str(not has_used_trial),
+                "plan": plan,
+            }
             params = {
-                "payment_method_types": ["card"],
-                "mode": "subscription",
-                "metadata": {
-                    "user_id": user_id,
-                    "has_trial": str(not has_used_trial),
-                    "plan": plan,
-                },
-                "success_url": f"https://macromealsapp.com/success?session_id={{CHECKOUT_SESSION_ID}}",
-                "cancel_url": "https://macromealsapp.com/cancel",
+                **self._checkout_template["yearly" if plan == "yearly" else "monthly"],
+                "metadata": metadata,
                 "customer": customer,
+                # lets the completed-session webhook resolve the user directly
+                "client_reference_id": user_id,
             }
-            if plan == "yearly":
-                params["line_items"] = [{"price": self.yearly_price_id, "quantity": 1}]
-            else:
-                params["line_items"] = [{"price": self.monthly_price_id, "quantity": 1}]
 
             # Add metadata to subscription
-            subscription_data: dict = {
-                "metadata": {
-                    "user_id": user_id,
-                    "has_trial": str(not has_used_trial),
-                    "plan": plan,
-                }
-            }
+            subscription_data: dict = {"metadata": metadata}
 
             # Add trial period if user hasn't used it before
             if not has_used_trial:
                 subscription_data["trial_period_days"] = 7
-                logger.info(f"User {user_id} eligible for 7-day trial")
+                logger.info("User %s eligible for 7-day trial", user_id)
             else:
-                logger.info(f"User {user_id} has already used trial - no trial period")
+                logger.info("User %s has already used trial - no trial period", user_id)
 
             params["subscription_data"] = subscription_data
 
-            checkout_session = stripe.checkout.Session.create(**params)
+            checkout_session = await self._stripe_call(
+                "checkout", self.client.checkout.sessions.create_async, params
+            )
 
-            logger.info(f"Checkout session created: {checkout_session.id}")
+            logger.info("Checkout session created: %s", checkout_session.id)
 
             if not checkout_session.url:
                 raise StripeServiceError("Checkout session URL is missing")
@@ -145,26 +405,54 @@ class StripeService:
                 checkout_url=checkout_session.url, session_id=checkout_session.id
             )
 
+        except StripeUnavailableError:
+            raise
         except stripe.StripeError as e:
-            logger.error(f"Stripe error: {str(e)}")
+            logger.error("Stripe error: %s", e)
             raise StripeServiceError(f"Error creating checkout session: {str(e)}")
         except HTTPException as e:
             raise
         except Exception as e:
-            logger.error(f"Unexpected error creating checkout session: {str(e)}")
+            logger.error("Unexpected error creating checkout session: %s", e)
             raise StripeServiceError(f"Unexpected error: {str(e)}")
 
-    def verify_webhook_signature(
-        self, payload: bytes, signature: str
-    ) -> Dict[str, Any]:
-        """Verify Stripe webhook signature.
+    @staticmethod
+    def _parse_sig_header(signature: str) -> Tuple[int, List[str]]:
+        """Split a Stripe-Signature header into its timestamp and v1 signatures.
+
+        Args:
+            signature: Signature header from request
+
+        Returns:
+            Tuple of the signing timestamp and the list of v1 signatures
+
+        Raises:
+            stripe.SignatureVerificationError: If the header is malformed
+        """
+        timestamp = None
+        signatures = []
+        for item in signature.split(","):
+            key, _, value = item.strip().partition("=")
+            if key == "t" and value.isdigit():
+                timestamp = int(value)
+            elif key == "v1":
+                signatures.append(value)
+
+        if timestamp is None or not signatures:
+            raise stripe.SignatureVerificationError(
+                "Unable to extract timestamp and signatures from header", signature
+            )
+        return timestamp, signatures
+
+    def verify_only(self, payload: bytes, signature: str) -> VerifiedPayload:
+        """Verify a Stripe webhook signature without parsing the event.
 
         Args:
             payload: Raw webhook payload
             signature: Signature header from request
 
         Returns:
-            Verified event data
+            VerifiedPayload wrapping the decoded body
 
         Raises:
             StripeServiceError: On signature verification failure
@@ -172,105 +460,154 @@ class StripeService:
         try:
             logger.info("Verifying webhook signature")
 
-            if not self.webhook_secret:
+            if not self.webhook_secrets:
                 logger.error("Webhook secret is not configured")
                 raise StripeServiceError("Webhook secret is not configured")
 
-            event = stripe.Webhook.construct_event(
-                payload=payload, sig_header=signature, secret=self.webhook_secret
-            )
+            # reject replayed/stale deliveries from the header alone, before
+            # spending any HMAC or decoding work on the body
+            timestamp, signatures = self._parse_sig_header(signature)
+            if abs(time.time() - timestamp) > stripe.Webhook.DEFAULT_TOLERANCE:
+                raise stripe.SignatureVerificationError(
+                    "Timestamp outside the tolerance zone", signature
+                )
+
+            # try each configured secret, starting with the one that matched last
+            signed_payload = f"{timestamp}.".encode() + payload
+            for secret in sorted(
+                self.webhook_secrets, key=lambda s: s != self._last_webhook_secret
+            ):
+                template = self._hmac_templates.get(secret)
+                if template is None:
+                    template = self._hmac_templates[secret] = hmac.new(
+                        secret.encode(), digestmod=hashlib.sha256
+                    )
+                mac = template.copy()
+                mac.update(signed_payload)
+                expected = mac.hexdigest()
+                if any(hmac.compare_digest(expected, sig) for sig in signatures):
+                    self._last_webhook_secret = secret
+                    break
+            else:
+                raise stripe.SignatureVerificationError(
+                    "No signatures found matching the expected signature for payload",
+                    signature,
+                )
 
-            logger.info(f"Webhook verified: {event.id}, type: {event.type}")
-            return event
+            return VerifiedPayload(body=payload.decode("utf-8"))
 
+        except StripeServiceError:
+            raise
         except ValueError as e:
-            logger.error(f"Invalid payload: {str(e)}")
+            logger.error("Invalid payload: %s", e)
             raise StripeServiceError(f"Invalid payload: {str(e)}")
         except stripe.SignatureVerificationError as e:
-            logger.error(f"Signature verification failed: {str(e)}")
+            logger.error("Signature verification failed: %s", e)
             raise StripeServiceError(f"Signature verification failed: {str(e)}")
         except Exception as e:
-            logger.error(f"Unexpected error verifying webhook: {str(e)}")
+            logger.error("Unexpected error verifying webhook: %s", e)
             raise StripeServiceError(f"Unexpected error: {str(e)}")
 
-    async def handle_checkout_completed(self, session: Dict[str, Any]) -> str:
-        """Handle checkout session completion.
+    def parse_payload(self, verified: VerifiedPayload) -> Dict[str, Any]:
+        """Parse a verified webhook body into a plain event dict.
 
         Args:
-            session: Stripe session data containing customer information
+            verified: Payload returned by verify_only
 
         Returns:
-            Stripe customer ID
+            Event data
 
         Raises:
-            StripeServiceError: When customer ID not found or update fails
+            StripeServiceError: If the body is not valid JSON
         """
         try:
-            # get stripe customer id
-            customer = session.get("customer", None)
+            return orjson.loads(verified.body)
+        except ValueError as e:
+            logger.error("Invalid payload: %s", e)
+            raise StripeServiceError(f"Invalid payload: {str(e)}")
 
-            if not customer:
-                logger.error("customer not found in session")
-                raise StripeServiceError("customer not found in session")
+    def verify_webhook_signature(
+        self, payload: bytes, signature: str
+    ) -> Dict[str, Any]:
+        """Verify Stripe webhook signature and parse the event.
 
-            logger.info(f"Processing completed checkout for user: {customer}")
+        Args:
+            payload: Raw webhook payload
+            signature: Signature header from request
 
-            await self.update_stripe_user_subscription(
-                customer, subscription_data={"is_pro": True}
-            )
+        Returns:
+            Verified event data
 
-            logger.info(f"User {customer} marked as subscribed")
-            return customer
+        Raises:
+            StripeServiceError: On signature verification failure
+        """
+        event = self.parse_payload(self.verify_only(payload, signature))
 
-        except Exception as e:
-            logger.error(f"Error handling checkout completed: {str(e)}")
-            raise StripeServiceError(f"Error handling checkout completed: {str(e)}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Webhook verified: %s, type: %s", event.get("id"), event.get("type")
+            )
+        return event
 
-    async def handle_stripe_customer_created(self, session: Dict[str, Any]) -> None:
-        """Handle new Stripe customer creation.
+    async def handle_checkout_completed(self, session: Dict[str, Any]) -> str:
+        """Handle checkout session completion.
 
-        Updates user profile with Stripe customer and subscription details.
+        The session carries everything needed to link the user to Stripe
+        (client_reference_id, customer and subscription), so no extra Stripe
+        lookups are made here.
 
         Args:
-            session: Stripe session data with email and customer ID
+            session: Stripe checkout session from the completed event
+
+        Returns:
+            Internal user ID, or the Stripe customer ID for sessions created
+            without a client_reference_id
 
         Raises:
-            StripeServiceError: When customer email missing or DB update fails
+            StripeServiceError: When customer ID not found or update fails
         """
         try:
-            customer_email = session.get("email", None)
-            customer_id = session["id"]
+            # get stripe customer id
+            customer = session.get("customer", None)
 
-            if not customer_email:
+            if not customer:
                 logger.error("customer not found in session")
                 raise StripeServiceError("customer not found in session")
 
-            if not BaseDatabaseService.subclasses:
-                raise StripeServiceError("No database service implementation available")
+            user_id = session.get("client_reference_id") or (
+                session.get("metadata") or {}
+            ).get("user_id")
+            subscription = session.get("subscription")
+            if isinstance(subscription, dict):
+                subscription = subscription.get("id")
 
-            # get subscription id from customer data
-            subscription = await self.get_subscription_with_retry(
-                customer_id=customer_id
+            logger.info(
+                "Processing completed checkout for user: %s", user_id or customer
             )
 
-            # update user data with stripe customer id
-            BaseDatabaseService.subclasses[0]().update_data(
-                table_name="user_profiles",
-                data={
-                    "stripe_customer_id": customer_id,
-                    "stripe_subscription_id": subscription["subscription_id"],
-                    "subscription_start": subscription["subscription_start"],
-                    "subscription_end": subscription["subscription_end"],
-                },
-                cols={"email": customer_email},
-            )
+            subscription_data: Dict[str, Any] = {"is_pro": True}
+            if subscription:
+                subscription_data["stripe_subscription_id"] = subscription
+
+            if user_id:
+                await get_database_service().update_data(
+                    table_name="user_profiles",
+                    data={**subscription_data, "stripe_customer_id": customer},
+                    cols={"id": user_id},
+                    returning="minimal",
+                )
+                user_service.invalidate_user_cache(user_id)
+            else:
+                await self.update_stripe_user_subscription(
+                    customer, subscription_data=subscription_data
+                )
+
+            logger.info("User %s marked as subscribed", user_id or customer)
+            return user_id or customer
 
-            logger.info(f"Stripe customer id created for: {customer_email}")
         except Exception as e:
-            logger.error(f"Error handling stripe customer created: {str(e)}")
-            raise StripeServiceError(
-                f"Error handling stripe customer created: {str(e)}"
-            )
+            logger.error("Error handling checkout completed: %s", e)
+            raise StripeServiceError(f"Error handling checkout completed: {str(e)}")
 
     async def update_stripe_user_subscription(
         self, customer: str, subscription_data: Dict[str, Any]
@@ -287,21 +624,20 @@ class StripeService:
 
         try:
             logger.info(
-                f"Marking user with stripe customer id {customer} as subscribed"
+                "Marking user with stripe customer id %s as subscribed", customer
             )
 
-            if not BaseDatabaseService.subclasses:
-                raise StripeServiceError("No database service implementation available")
-
             # update user's stripe details
-            BaseDatabaseService.subclasses[0]().update_data(
+            result = await get_database_service().update_data(
                 table_name="user_profiles",
                 data=subscription_data,
                 cols={"stripe_customer_id": customer},
             )
+            for row in result["data"]:
+                user_service.invalidate_user_cache(row["id"])
 
         except Exception as e:
-            logger.error(f"Error updating user subscription: {str(e)}")
+            logger.error("Error updating user subscription: %s", e)
             raise StripeServiceError(f"Error updating user subscription: {str(e)}")
 
     async def cancel_user_subscription(
@@ -320,41 +656,64 @@ class StripeService:
             StripeServiceError: When subscription not found or cancellation fails
         """
         try:
-            logger.info(f"Cancelling subscription for user: {user_id}")
-            if not BaseDatabaseService.subclasses:
-                raise StripeServiceError("No database service implementation available")
+            logger.info("Cancelling subscription for user: %s", user_id)
 
             # fetch stripe subscription id for user if it exists
-            response = BaseDatabaseService.subclasses[0]().select_data(
-                table_name="user_profiles", cols={"id": user_id}
-            )
-            if response and isinstance(response, List):
-                subscription_id = response[0]["stripe_subscription_id"]
-            elif response:
-                subscription_id = response
-
-            else:
-                subscription_id = None
+            customer_id, subscription_id = await self._get_user_stripe_ids(user_id)
 
             if not subscription_id:
                 raise StripeServiceError("Subscription id not found for customer")
 
-
             if cancel_at_period_end:
-                sub = stripe.Subscription.modify(
+                sub = await self._stripe_call(
+                    "subscription",
+                    self.client.subscriptions.update_async,
                     subscription_id,
-                    cancel_at_period_end=True,
+                    {"cancel_at_period_end": True},
                 )
             else:
-                sub = stripe.Subscription.delete(subscription_id)
+                sub = await self._stripe_call(
+                    "subscription",
+                    self.client.subscriptions.cancel_async,
+                    subscription_id,
+                )
+
+                # the subscription is gone now; don't leave the profile pointing
+                # at it until the customer.subscription.deleted webhook lands
+                try:
+                    await get_database_service().update_data(
+                        table_name="user_profiles",
+                        data={
+                            "is_pro": False,
+                            "stripe_subscription_id": None,
+                            "subscription_start": None,
+                            "subscription_end": None,
+                            "trial_end_date": None,
+                            "plan": None,
+                        },
+                        cols={"id": user_id},
+                        returning="minimal",
+                    )
+                    user_service.invalidate_user_cache(user_id)
+                except Exception as e:
+                    logger.warning(
+                        "Failed to clear subscription for user %s: %s", user_id, e
+                    )
+                if customer_id:
+                    try:
+                        await self.redis.delete(f"stripe:cust:{customer_id}:sub")
+                    except redis.RedisError as e:
+                        logger.warning("Subscription cache delete failed: %s", e)
 
             return sub
+        except StripeUnavailableError:
+            raise
         except stripe.StripeError as e:
-            logger.error(f"Stripe error: {str(e)}")
+            logger.error("Stripe error: %s", e)
             raise StripeServiceError(f"Error cancelling subscription: {str(e)}")
         except Exception as e:
             logger.error(
-                f"Failed to cancel subscription for user: {user_id} with error{str(e)}"
+                "Failed to cancel subscription for user: %s with error%s", user_id, e
             )
             raise StripeServiceError("Unexpected error while cancelling subscription")
 
@@ -371,10 +730,7 @@ class StripeService:
             StripeServiceError: When subscription not found, not eligible for reactivation, or reactivation fails
         """
         try:
-            logger.info(f"Reactivating subscription for user: {user_id}")
-
-            if not BaseDatabaseService.subclasses:
-                raise StripeServiceError("No database service implementation available")
+            logger.info("Reactivating subscription for user: %s", user_id)
 
             # Get subscription details first
             subscription_details = await self.get_subscription_details(user_id)
@@ -410,81 +766,148 @@ class StripeService:
                 )
 
             # Reactivate the subscription
-            subscription = stripe.Subscription.modify(
-                subscription_id, cancel_at_period_end=False
+            subscription = await self._stripe_call(
+                "subscription",
+                self.client.subscriptions.update_async,
+                subscription_id,
+                {"cancel_at_period_end": False},
             )
 
             logger.info(
-                f"Successfully reactivated subscription {subscription_id} for user {user_id}"
+                "Successfully reactivated subscription %s for user %s",
+                subscription_id,
+                user_id,
             )
             return subscription
 
         except stripe.StripeError as e:
-            logger.error(f"Stripe error: {str(e)}")
+            logger.error("Stripe error: %s", e)
             raise StripeServiceError(f"Error reactivating subscription: {str(e)}")
         except StripeServiceError:
             raise
         except Exception as e:
             logger.error(
-                f"Failed to reactivate subscription for user: {user_id} with error: {str(e)}"
+                "Failed to reactivate subscription for user: %s with error: %s",
+                user_id,
+                e,
             )
             raise StripeServiceError("Unexpected error while reactivating subscription")
 
     async def get_subscription_with_retry(
-        self, customer_id: str, retries: int = 2, delay: float = 2.0
+        self,
+        customer_id: str,
+        retries: int = 2,
+        delay: float = 2.0,
+        max_delay: float = 32.0,
     ) -> Dict:
         """Get customer subscription with retry logic.
 
         Args:
             customer_id: Stripe customer ID
             retries: Maximum retry attempts
-            delay: Seconds between retries
+            delay: Base delay in seconds, doubled on each retry
+            max_delay: Upper bound on the backoff before jitter is added
 
         Returns:
             Dict with subscription_id, subscription_start and subscription_end
 
         Raises:
-            StripeServiceError: When no active subscriptions found after retries
+            StripeServiceError: When no trialing subscription found after retries
         """
+        cache_key = f"stripe:cust:{customer_id}:sub"
+        try:
+            cached = await self.redis.get(cache_key)
+            if cached:
+                return orjson.loads(cached)
+        except redis.RedisError as e:
+            logger.warning("Subscription cache read failed: %s", e)
+
         for attempt in range(1, retries + 1):
             try:
-                customer = stripe.Customer.retrieve(
-                    customer_id, expand=["subscriptions.data"]
+                # transient network/5xx errors are retried by the SDK itself, so
+                # only the race where the subscription doesn't exist yet is
+                # retried here
+                subscriptions = await self._stripe_call(
+                    "subscription",
+                    self.client.subscriptions.list_async,
+                    {"customer": customer_id, "status": "trialing", "limit": 1},
                 )
-                subscriptions = (
-                    customer.subscriptions.data if customer.subscriptions else []
+            except stripe.StripeError as e:
+                raise StripeServiceError(f"Failed to retrieve subscription: {e}")
+
+            if subscriptions.data:
+                # get first trial subscription
+                subscription = self._trial_subscription_summary(subscriptions.data[0])
+                await self._cache_subscription(customer_id, subscription)
+                return subscription
+
+            if attempt < retries:
+                # capped exponential backoff with jitter proportional to the base
+                # delay, without blocking the event loop
+                await asyncio.sleep(
+                    min(max_delay, delay * (2 ** (attempt - 1)))
+                    + random.uniform(0, 0.25 * delay)
                 )
-                if subscriptions:
-                    # get first trial subscription
-                    trial_subs = [s for s in subscriptions if s["status"] == "trialing"]
-                    subscription_id = trial_subs[0]["id"]
-                    subscription_start = datetime.fromtimestamp(
-                        trial_subs[0]["items"]["data"][0]["current_period_start"]
-                    ).isoformat()
-                    subscription_end = datetime.fromtimestamp(
-                        trial_subs[0]["items"]["data"][0]["current_period_end"]
-                    ).isoformat()
-                    return {
-                        "subscription_id": subscription_id,
-                        "subscription_start": subscription_start,
-                        "subscription_end": subscription_end,
-                    }
-                else:
-                    raise StripeServiceError(
-                        f"No subscriptions found for customer {customer_id}"
-                    )
-            except (stripe.StripeError, StripeServiceError) as e:
-                if attempt == retries:
-                    raise StripeServiceError(
-                        f"Failed to retrieve subscription after {retries} attempts: {e}"
-                    )
-                time.sleep(delay)
 
-        # This should never be reached due to the exception handling above
         raise StripeServiceError(
-            f"Failed to retrieve subscription for customer {customer_id}"
+            f"Failed to retrieve subscription after {retries} attempts: "
+            f"No subscriptions found for customer {customer_id}"
         )
 
+    @staticmethod
+    def _trial_subscription_summary(subscription: Dict[str, Any]) -> Dict[str, str]:
+        """Extract the fields persisted for a trial subscription.
+
+        Args:
+            subscription: Stripe subscription object or webhook payload
+
+        Returns:
+            Dict with subscription_id, subscription_start and subscription_end
+        """
+        subscription_item = subscription["items"]["data"][0]
+        return {
+            "subscription_id": subscription["id"],
+            "subscription_start": _utc_isoformat(
+                subscription_item["current_period_start"]
+            ),
+            "subscription_end": _utc_isoformat(subscription_item["current_period_end"]),
+        }
+
+    async def _cache_subscription(
+        self, customer_id: str, subscription: Dict[str, str]
+    ) -> None:
+        """Store a customer's trial subscription lookup in Redis.
+
+        Args:
+            customer_id: Stripe customer ID
+            subscription: Result of _trial_subscription_summary
+        """
+        try:
+            await self.redis.setex(
+                f"stripe:cust:{customer_id}:sub",
+                SUBSCRIPTION_CACHE_TTL,
+                orjson.dumps(subscription),
+            )
+        except redis.RedisError as e:
+            logger.warning("Subscription cache write failed: %s", e)
+
+    async def cache_subscription_from_event(self, subscription: Dict[str, Any]) -> None:
+        """Populate the subscription cache from a webhook subscription payload.
+
+        Lets later lookups for the customer skip the Stripe API entirely.
+
+        Args:
+            subscription: Subscription object from a customer.subscription.* event
+        """
+        if subscription.get("status") != "trialing":
+            return
+        try:
+            summary = self._trial_subscription_summary(subscription)
+        except (KeyError, IndexError, TypeError) as e:
+            logger.warning("Cannot cache subscription from event payload: %s", e)
+            return
+        await self._cache_subscription(subscription["customer"], summary)
+
     async def create_stripe_customer(self, user_id: str, email: str) -> str:
         """Create Stripe customer and update user profile.
 
@@ -499,24 +922,29 @@ class StripeService:
             StripeServiceError: On Stripe API or database errors
         """
         try:
-            if not BaseDatabaseService.subclasses:
-                raise StripeServiceError("No database service implementation available")
-            customer = stripe.Customer.create(
-                email=email, metadata={"user_id": user_id}
+            customer = await self._stripe_call(
+                "customer",
+                self.client.customers.create_async,
+                {"email": email, "metadata": {"user_id": user_id}},
+                {"idempotency_key": self._idempotency_key("customer", user_id, email)},
             )
             # update user's associated stripe customer id
-            BaseDatabaseService.subclasses[0]().update_data(
+            await get_database_service().update_data(
                 table_name="user_profiles",
                 data={"stripe_customer_id": customer.id},
                 cols={"id": user_id},
             )
+            user_service.invalidate_user_cache(user_id)
+            self._stripe_customer_cache.set(user_id, customer.id)
             return customer.id
+        except StripeUnavailableError:
+            raise
         except stripe.StripeError as e:
-            logger.error(f"Stripe error: {str(e)}")
+            logger.error("Stripe error: %s", e)
             raise StripeServiceError(f"Error creating stripe customer: {str(e)}")
         except Exception as e:
             logger.error(
-                f"Failed to create stripe customer: {user_id} with error: {str(e)}"
+                "Failed to create stripe customer: %s with error: %s", user_id, e
             )
             raise StripeServiceError("Unexpected error while creating stripe customer")
 
@@ -532,29 +960,55 @@ class StripeService:
         Raises:
             StripeServiceError: On database errors
         """
+        cached = self._stripe_customer_cache.get(user_id)
+        if cached is not None:
+            return cached
+
         try:
-            if not BaseDatabaseService.subclasses:
-                raise StripeServiceError("No database service implementation available")
             # fetch stripe customer id for user if it exists
-            response = BaseDatabaseService.subclasses[0]().select_data(
-                table_name="user_profiles", cols={"id": user_id}
+            response = await get_database_service().select_data(
+                table_name="user_profiles",
+                query="stripe_customer_id",
+                cols={"id": user_id},
             )
-            if response and isinstance(response, List):
-                customer = response[0]["stripe_customer_id"]
-            elif response:
-                customer = response
-
-            else:
-                customer = None
+            customer = response[0].get("stripe_customer_id") if response else None
+            if customer:
+                # a user's customer id never changes once set
+                self._stripe_customer_cache.set(user_id, customer)
             return customer
         except Exception as e:
             logger.info(
-                f"An unexpected error occured while retrieving stripe customer:{str(e)}"
+                "An unexpected error occured while retrieving stripe customer:%s", e
             )
             raise StripeServiceError(
                 "Unexpected error while retrieving stripe customer"
             )
 
+    async def _get_user_stripe_ids(
+        self, user_id: str
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Fetch a user's Stripe customer and subscription ids in one query.
+
+        Only the customer id is cached; the subscription id changes on every
+        resubscribe and is written by webhooks keyed on the customer.
+
+        Args:
+            user_id: Internal user ID
+
+        Returns:
+            Tuple of (stripe_customer_id, stripe_subscription_id), each None if unset
+        """
+        response = await get_database_service().select_data(
+            table_name="user_profiles",
+            query="stripe_customer_id, stripe_subscription_id",
+            cols={"id": user_id},
+        )
+        row = response[0] if response else {}
+        customer_id = row.get("stripe_customer_id")
+        if customer_id:
+            self._stripe_customer_cache.set(user_id, customer_id)
+        return customer_id, row.get("stripe_subscription_id")
+
     async def create_ephemeral_key(self, user_id: str, customer_id: str) -> str:
         """Create Stripe ephemeral key for client-side API access.
 
@@ -569,16 +1023,21 @@ class StripeService:
             StripeServiceError: On key creation failure
         """
         try:
-            ephemeral_key = stripe.EphemeralKey.create(
-                customer=customer_id, stripe_version=stripe.api_version
+            ephemeral_key = await self._stripe_call(
+                "customer",
+                self.client.ephemeral_keys.create_async,
+                {"customer": customer_id},
+                {"stripe_version": STRIPE_API_VERSION},
             )
             return ephemeral_key["secret"]
+        except StripeUnavailableError:
+            raise
         except stripe.StripeError as e:
-            logger.error(f"Stripe error: {str(e)}")
+            logger.error("Stripe error: %s", e)
             raise StripeServiceError(f"Error creating ephemeral key: {str(e)}")
         except Exception as e:
             logger.error(
-                f"Failed to create ephemeral key: {user_id} with error: {str(e)}"
+                "Failed to create ephemeral key: %s with error: %s", user_id, e
             )
             raise StripeServiceError("Unexpected error occured")
 
@@ -601,21 +1060,27 @@ class StripeService:
             StripeServiceError: On setup intent creation failure
         """
         try:
-            setup_intent = stripe.SetupIntent.create(
-                customer=customer_id,
-                payment_method_types=["card"],
-                usage="off_session",  # Indicates payment method can be charged when customer is not present
-                metadata={"user_id": user_id, "plan": plan},
+            setup_intent = await self._stripe_call(
+                "setup_intent",
+                self.client.setup_intents.create_async,
+                {
+                    "customer": customer_id,
+                    "payment_method_types": ["card"],
+                    "usage": "off_session",  # Indicates payment method can be charged when customer is not present
+                    "metadata": {"user_id": user_id, "plan": plan},
+                },
             )
             if not setup_intent.client_secret:
                 raise StripeServiceError("Setup intent client secret is missing")
             return setup_intent.client_secret
+        except StripeUnavailableError:
+            raise
         except stripe.StripeError as e:
-            logger.error(f"Stripe error: {str(e)}")
+            logger.error("Stripe error: %s", e)
             raise StripeServiceError(f"Error creating stripe customer: {str(e)}")
         except Exception as e:
             logger.error(
-                f"Failed to create setup intent for user: {user_id} with error: {str(e)}"
+                "Failed to create setup intent for user: %s with error: %s", user_id, e
             )
             raise StripeServiceError("Unexpected error while creating setup intent")
 
@@ -625,6 +1090,7 @@ class StripeService:
         payment_method_id: str,
         user_id: str,
         plan: Literal["monthly", "yearly"] = "monthly",
+        setup_intent_id: Optional[str] = None,
     ) -> str:
         """Create subscription with conditional trial period.
 
@@ -633,6 +1099,9 @@ class StripeService:
             payment_method_id: Stripe payment method ID
             user_id: Internal user ID
             plan: Subscription plan (monthly or yearly)
+            setup_intent_id: Setup intent the subscription is created for; a
+                redelivered or replayed event for it then gets the subscription
+                created the first time instead of a second one
 
         Returns:
             Subscription ID
@@ -641,8 +1110,6 @@ class StripeService:
             StripeServiceError: On subscription creation failure
         """
         try:
-            if not BaseDatabaseService.subclasses:
-                raise StripeServiceError("No database service implementation available")
 
             # CRITICAL: Check for existing active subscriptions in Stripe first
             existing_subscriptions = await self.get_active_stripe_subscriptions(
@@ -650,33 +1117,36 @@ class StripeService:
             )
             if existing_subscriptions:
                 logger.warning(
-                    f"Customer {customer_id} already has {len(existing_subscriptions)} active subscription(s)"
+                    "Customer %s already has %s active subscription(s)",
+                    customer_id,
+                    len(existing_subscriptions),
                 )
                 # Use the first active subscription instead of creating a new one
                 existing_sub = existing_subscriptions[0]
 
                 # Update database with existing subscription
-                BaseDatabaseService.subclasses[0]().update_data(
+                await get_database_service().update_data(
                     table_name="user_profiles",
                     data={"stripe_subscription_id": existing_sub.id, "is_pro": True},
                     cols={"stripe_customer_id": customer_id},
                 )
+                user_service.invalidate_user_cache(user_id)
 
                 logger.info(
-                    f"Using existing subscription {existing_sub.id} for customer {customer_id}"
+                    "Using existing subscription %s for customer %s",
+                    existing_sub.id,
+                    customer_id,
                 )
                 return existing_sub.id
 
             # Check if user has already used their trial
-            from app.services.user_service import user_service
-
             user_profile = await user_service.get_user_profile(user_id)
             has_used_trial = user_profile.has_used_trial
 
             if plan == "yearly":
-                price_id = settings.STRIPE_YEARLY_PRICE_ID
+                price_id = self.yearly_price_id
             else:
-                price_id = settings.STRIPE_MONTHLY_PRICE_ID
+                price_id = self.monthly_price_id
 
             if not price_id:
                 raise StripeServiceError("Price ID not configured")
@@ -693,51 +1163,80 @@ class StripeService:
             if not has_used_trial:
                 subscription_params["trial_period_days"] = 7
                 logger.info(
-                    f"Creating subscription with 7-day trial for user: {user_id}"
+                    "Creating subscription with 7-day trial for user: %s", user_id
                 )
             else:
-                logger.info(f"Creating subscription without trial for user: {user_id}")
+                logger.info("Creating subscription without trial for user: %s", user_id)
 
             # Create the subscription
-            subscription = stripe.Subscription.create(**subscription_params)
+            options = {}
+            if setup_intent_id:
+                options["idempotency_key"] = self._idempotency_key(
+                    "subscription", customer_id, setup_intent_id
+                )
+            subscription = await self._stripe_call(
+                "subscription",
+                self.client.subscriptions.create_async,
+                subscription_params,
+                options,
+            )
 
             # Double-check no duplicate was created during the API call
             all_subscriptions = await self.get_active_stripe_subscriptions(customer_id)
             if len(all_subscriptions) > 1:
                 logger.warning(
-                    f"Multiple subscriptions detected for customer {customer_id}. Using the newest one."
+                    "Multiple subscriptions detected for customer %s. Using the newest one.",
+                    customer_id,
                 )
                 # Cancel all but the newest subscription
                 newest_sub = max(all_subscriptions, key=lambda s: s.created)
                 for sub in all_subscriptions:
                     if sub.id != newest_sub.id:
-                        logger.info(f"Cancelling duplicate subscription {sub.id}")
+                        logger.info("Cancelling duplicate subscription %s", sub.id)
                         try:
-                            stripe.Subscription.cancel(sub.id)
+                            await self._stripe_call(
+                                "subscription",
+                                self.client.subscriptions.cancel_async,
+                                sub.id,
+                                options={
+                                    "idempotency_key": self._idempotency_key(
+                                        "cancel_duplicate", customer_id, sub.id
+                                    )
+                                },
+                            )
                         except Exception as e:
                             logger.error(
-                                f"Failed to cancel duplicate subscription {sub.id}: {str(e)}"
+                                "Failed to cancel duplicate subscription %s: %s",
+                                sub.id,
+                                e,
                             )
                 subscription = newest_sub
 
             # update user's subscription
-            BaseDatabaseService.subclasses[0]().update_data(
+            await get_database_service().update_data(
                 table_name="user_profiles",
                 data={"stripe_subscription_id": subscription.id, "is_pro": True},
                 cols={"stripe_customer_id": customer_id},
             )
+            user_service.invalidate_user_cache(user_id)
 
             logger.info(
-                f"Successfully created subscription {subscription.id} for customer {customer_id}"
+                "Successfully created subscription %s for customer %s",
+                subscription.id,
+                customer_id,
             )
             return subscription.id
 
+        except StripeUnavailableError:
+            raise
         except stripe.StripeError as e:
-            logger.error(f"Stripe error: {str(e)}")
+            logger.error("Stripe error: %s", e)
             raise StripeServiceError(f"Error creating stripe subscription: {str(e)}")
         except Exception as e:
             logger.error(
-                f"Failed to create subscription for stripe customer: {customer_id} with error: {str(e)}"
+                "Failed to create subscription for stripe customer: %s with error: %s",
+                customer_id,
+                e,
             )
             raise StripeServiceError(
                 "Unexpected error while creating user subscription"
@@ -759,19 +1258,25 @@ class StripeService:
             StripeServiceError: On portal session creation failure
         """
         try:
-            session = stripe.billing_portal.Session.create(
-                customer=customer_id,
-                return_url=f"https://macromealsapp.com/settings/billing",
+            session = await self._stripe_call(
+                "billing_portal",
+                self.client.billing_portal.sessions.create_async,
+                {
+                    "customer": customer_id,
+                    "return_url": f"https://macromealsapp.com/settings/billing",
+                }
             )
             return session.url
+        except StripeUnavailableError:
+            raise
         except stripe.StripeError as e:
-            logger.error(f"Stripe error: {str(e)}")
+            logger.error("Stripe error: %s", e)
             raise StripeServiceError(
                 f"Error creating stripe customer billing portal: {str(e)}"
             )
         except Exception as e:
             logger.error(
-                f"Failed to create subscription for user: {user_id} with error: {str(e)}"
+                "Failed to create subscription for user: %s with error: %s", user_id, e
             )
             raise StripeServiceError(
                 "Unexpected error while creating stripe customer billing portal"
@@ -787,21 +1292,56 @@ class StripeService:
             Customer email or None if not found
         """
         try:
-            logger.info(f"Retrieving email for customer: {customer_id}")
-            customer = stripe.Customer.retrieve(customer_id)
-            return customer.get("email")
+            cached = self._customer_email_cache.get(customer_id)
+            if cached is not None:
+                return cached
+
+            logger.info("Retrieving email for customer: %s", customer_id)
+            customer = await self._stripe_call(
+                "customer", self.client.customers.retrieve_async, customer_id
+            )
+            email = customer.get("email")
+            if email:
+                self._customer_email_cache.set(customer_id, email)
+            return email
         except stripe.StripeError as e:
-            logger.error(f"Stripe error retrieving customer email: {str(e)}")
+            logger.error("Stripe error retrieving customer email: %s", e)
             return None
         except Exception as e:
-            logger.error(f"Error retrieving customer email: {str(e)}")
+            logger.error("Error retrieving customer email: %s", e)
             return None
 
-    async def has_active_subscription(self, user_id: str) -> bool:
+    def invalidate_customer_email(self, customer_id: str) -> None:
+        """Drop a cached customer email, e.g. after a customer.updated event.
+
+        Args:
+            customer_id: Stripe customer ID
+        """
+        self._customer_email_cache.invalidate(customer_id)
+
+    async def _get_user_profile_row(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch the user's user_profiles row.
+
+        Args:
+            user_id: Internal user ID
+
+        Returns:
+            The profile row, or None if the user has no profile
+        """
+        response = await get_database_service().select_data(
+            table_name="user_profiles",
+            cols={"id": user_id},
+        )
+        return response[0] if response else None
+
+    async def has_active_subscription(
+        self, user_id: str, user_data: Optional[Dict[str, Any]] = None
+    ) -> bool:
         """Check if user has an active subscription.
 
         Args:
             user_id: Internal user ID
+            user_data: Already fetched user_profiles row, to skip the lookup
 
         Returns:
             True if user has active subscription, False otherwise
@@ -810,30 +1350,27 @@ class StripeService:
             StripeServiceError: On database errors
         """
         try:
-            logger.info(f"Checking subscription status for user: {user_id}")
-
-            if not BaseDatabaseService.subclasses:
-                raise StripeServiceError("No database service implementation available")
+            logger.info("Checking subscription status for user: %s", user_id)
 
             # Get user profile to check subscription status
-            response = BaseDatabaseService.subclasses[0]().select_data(
-                table_name="user_profiles", cols={"id": user_id}
-            )
+            if user_data is None:
+                user_data = await self._get_user_profile_row(user_id)
 
-            if not response:
-                logger.info(f"No profile found for user: {user_id}")
+            if not user_data:
+                logger.info("No profile found for user: %s", user_id)
                 return False
 
-            # Handle both list and dict responses
-            user_data = response[0] if isinstance(response, List) else response
-
             # Check if user is marked as pro and has subscription ID
             is_pro = user_data.get("is_pro", False)
             subscription_id = user_data.get("stripe_subscription_id")
             customer_id = user_data.get("stripe_customer_id")
 
             logger.info(
-                f"User {user_id} - is_pro: {is_pro}, subscription_id: {subscription_id}, customer_id: {customer_id}"
+                "User %s - is_pro: %s, subscription_id: %s, customer_id: %s",
+                user_id,
+                is_pro,
+                subscription_id,
+                customer_id,
             )
 
             # If database shows user as pro with subscription, verify with Stripe
@@ -848,25 +1385,26 @@ class StripeService:
                     active_sub_ids = [sub.id for sub in active_subscriptions]
                     if subscription_id in active_sub_ids:
                         logger.info(
-                            f"Subscription {subscription_id} confirmed active in Stripe"
+                            "Subscription %s confirmed active in Stripe",
+                            subscription_id,
                         )
                         return True
                     else:
                         logger.warning(
-                            f"Database shows subscription {subscription_id} but it's not active in Stripe"
+                            "Database shows subscription %s but it's not active in Stripe",
+                            subscription_id,
                         )
                         # Update database to reflect actual state
-                        BaseDatabaseService.subclasses[0]().update_data(
+                        await get_database_service().update_data(
                             table_name="user_profiles",
                             data={"is_pro": False, "stripe_subscription_id": None},
                             cols={"id": user_id},
                         )
+                        user_service.invalidate_user_cache(user_id)
                         return False
 
                 except StripeServiceError as e:
-                    logger.warning(
-                        f"Could not verify subscription with Stripe: {str(e)}"
-                    )
+                    logger.warning("Could not verify subscription with Stripe: %s", e)
                     # Fall back to database status if Stripe is unavailable
                     return bool(is_pro and subscription_id)
 
@@ -878,11 +1416,12 @@ class StripeService:
                     )
                     if active_subscriptions:
                         logger.info(
-                            f"Found {len(active_subscriptions)} active subscription(s) in Stripe not reflected in database"
+                            "Found %s active subscription(s) in Stripe not reflected in database",
+                            len(active_subscriptions),
                         )
                         # Update database with the first active subscription
                         latest_sub = max(active_subscriptions, key=lambda s: s.created)
-                        BaseDatabaseService.subclasses[0]().update_data(
+                        await get_database_service().update_data(
                             table_name="user_profiles",
                             data={
                                 "is_pro": True,
@@ -890,16 +1429,17 @@ class StripeService:
                             },
                             cols={"id": user_id},
                         )
+                        user_service.invalidate_user_cache(user_id)
                         return True
 
                 except StripeServiceError as e:
-                    logger.warning(f"Could not check Stripe subscriptions: {str(e)}")
+                    logger.warning("Could not check Stripe subscriptions: %s", e)
 
             return False
 
         except Exception as e:
             logger.error(
-                f"Error checking subscription status for user {user_id}: {str(e)}"
+                "Error checking subscription status for user %s: %s", user_id, e
             )
             raise StripeServiceError(f"Error checking subscription status: {str(e)}")
 
@@ -919,34 +1459,40 @@ class StripeService:
         """
         try:
             logger.info(
-                f"Checking for active subscriptions for customer: {customer_id}"
+                "Checking for active subscriptions for customer: %s", customer_id
             )
 
-            # Retrieve customer with expanded subscriptions
-            customer = stripe.Customer.retrieve(customer_id, expand=["subscriptions"])
+            # list the customer's subscriptions directly instead of pulling the
+            # whole customer object; the default status filter already drops
+            # canceled ones
+            subscriptions = await self._stripe_call(
+                "subscription",
+                self.client.subscriptions.list_async,
+                {"customer": customer_id, "limit": 100},
+            )
 
             # Filter for active subscriptions (active, trialing, past_due)
-            active_statuses = ["active", "trialing", "past_due"]
+            active_statuses = ("active", "trialing", "past_due")
             active_subscriptions = [
-                sub
-                for sub in (
-                    customer.subscriptions.data if customer.subscriptions else []
-                )
-                if sub.status in active_statuses
+                sub for sub in subscriptions.data if sub.status in active_statuses
             ]
 
             logger.info(
-                f"Found {len(active_subscriptions)} active subscription(s) for customer {customer_id}"
+                "Found %s active subscription(s) for customer %s",
+                len(active_subscriptions),
+                customer_id,
             )
             return active_subscriptions
 
+        except StripeUnavailableError:
+            raise
         except stripe.StripeError as e:
-            logger.error(f"Stripe error retrieving subscriptions: {str(e)}")
+            logger.error("Stripe error retrieving subscriptions: %s", e)
             raise StripeServiceError(
                 f"Error retrieving customer subscriptions: {str(e)}"
             )
         except Exception as e:
-            logger.error(f"Unexpected error retrieving subscriptions: {str(e)}")
+            logger.error("Unexpected error retrieving subscriptions: %s", e)
             raise StripeServiceError(
                 f"Unexpected error retrieving subscriptions: {str(e)}"
             )
@@ -965,7 +1511,7 @@ class StripeService:
         """
         try:
             logger.info(
-                f"Getting detailed subscription information for user: {user_id}"
+                "Getting detailed subscription information for user: %s", user_id
             )
 
             # Get customer ID
@@ -984,10 +1530,9 @@ class StripeService:
             # Get the most recent subscription
             subscription = max(active_subscriptions, key=lambda s: s.created)
 
-            # Get the subscription with expanded price data
-            detailed_subscription = stripe.Subscription.retrieve(
-                subscription.id, expand=["items.data.price.product"]
-            )
+            # listed subscriptions already embed their items and prices, and the
+            # product is never read, so no second expanded retrieve is needed
+            detailed_subscription = subscription
 
             # Extract price information
             subscription_item = (
@@ -1060,15 +1605,99 @@ class StripeService:
                 "created": datetime.fromtimestamp(created) if created is not None else None,
             }
 
+        except StripeUnavailableError:
+            raise
         except stripe.StripeError as e:
-            logger.error(f"Stripe error getting subscription details: {str(e)}")
+            logger.error("Stripe error getting subscription details: %s", e)
             raise StripeServiceError(f"Error retrieving subscription details: {str(e)}")
         except Exception as e:
             logger.error(
-                f"Error getting subscription details for user {user_id}: {str(e)}"
+                "Error getting subscription details for user %s: %s", user_id, e
             )
             raise StripeServiceError(f"Error getting subscription details: {str(e)}")
 
+    async def claim_webhook_event(self, event_id: str) -> Optional[bool]:
+        """Atomically claim a webhook event for processing.
+
+        Args:
+            event_id: Stripe event ID
+
+        Returns:
+            True if this is the first delivery, False if the event was already
+            claimed, None if Redis is unavailable and the caller should fall
+            back to is_webhook_event_processed
+        """
+        try:
+            claimed = await self.redis.set(
+                f"stripe:evt:{event_id}", "1", ex=WEBHOOK_EVENT_TTL, nx=True
+            )
+            return bool(claimed)
+        except redis.RedisError as e:
+            logger.warning("Webhook dedupe unavailable for %s: %s", event_id, e)
+            return None
+
+    async def release_webhook_event(self, event_id: str) -> None:
+        """Drop the claim on a webhook event so a redelivery is processed.
+
+        Args:
+            event_id: Stripe event ID
+        """
+        try:
+            await self.redis.delete(f"stripe:evt:{event_id}")
+        except redis.RedisError as e:
+            logger.warning("Webhook claim release failed for %s: %s", event_id, e)
+
+    async def claim_webhook_replay(self, ttl: int) -> bool:
+        """Claim the next webhook replay pass so only one worker runs it.
+
+        Args:
+            ttl: Seconds the claim is held
+
+        Returns:
+            True if this worker should run the pass; also True when Redis is
+            unavailable, since replayed events are handled idempotently
+        """
+        try:
+            return bool(
+                await self.redis.set("stripe:webhook:replay", "1", ex=ttl, nx=True)
+            )
+        except redis.RedisError as e:
+            logger.warning("Webhook replay lock unavailable: %s", e)
+            return True
+
+    async def is_stale_webhook_event(self, event: Dict[str, Any]) -> bool:
+        """Check whether a subscription event is older than one already handled.
+
+        Stripe does not guarantee delivery order, so an older
+        customer.subscription.* event must not overwrite state written by a
+        newer one. An event that is not stale is recorded as the latest for
+        its subscription, so call this once, right before handling the event.
+
+        Args:
+            event: Verified Stripe event
+
+        Returns:
+            True if a newer event for the same subscription was already seen
+        """
+        if not event["type"].startswith("customer.subscription."):
+            return False
+
+        subscription_id = event["data"]["object"].get("id")
+        created = event.get("created")
+        if not subscription_id or created is None:
+            return False
+
+        key = f"stripe:sub:{subscription_id}:last_event"
+        try:
+            return bool(
+                await self._record_subscription_event(
+                    keys=[key], args=[created, WEBHOOK_EVENT_TTL]
+                )
+            )
+        except redis.RedisError as e:
+            logger.warning("Webhook ordering check unavailable: %s", e)
+        return False
+
     async def is_webhook_event_processed(self, event_id: str) -> bool:
         """Check if a webhook event has already been processed.
 
@@ -1078,92 +1707,349 @@ class StripeService:
         Returns:
             True if the event has been processed, False otherwise
         """
-        import httpx
-        from app.core.config import settings
-
-        logger.info(f"Checking if webhook event {event_id} has been processed")
+        logger.info("Checking if webhook event %s has been processed", event_id)
 
         try:
             if not settings.SUPABASE_SERVICE_ROLE_KEY:
                 logger.error("SUPABASE_SERVICE_ROLE_KEY is not configured")
                 return False
 
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{settings.SUPABASE_URL}/rest/v1/webhook_events",
-                    headers={
-                        "apikey": settings.SUPABASE_SERVICE_ROLE_KEY,
-                        "Authorization": f"Bearer {settings.SUPABASE_SERVICE_ROLE_KEY}",
-                        "Content-Type": "application/json",
-                    },
-                    params={"event_id": f"eq.{event_id}"},
-                )
+            client = user_service.get_client()
+            response = await client.get(
+                WEBHOOK_EVENTS_PATH, params={"event_id": f"eq.{event_id}"}
+            )
 
-                if response.status_code == 200:
-                    events = response.json()
-                    is_processed = len(events) > 0
-                    logger.info(f"Event {event_id} processed status: {is_processed}")
-                    return is_processed
-                else:
-                    logger.warning(
-                        f"Failed to check webhook event status: {response.status_code}"
-                    )
-                    return False
+            if response.is_success:
+                events = response.json()
+                is_processed = len(events) > 0
+                logger.info("Event %s processed status: %s", event_id, is_processed)
+                return is_processed
+            else:
+                logger.warning(
+                    "Failed to check webhook event status: %s", response.status_code
+                )
+                return False
 
         except Exception as e:
-            logger.error(f"Error checking webhook event: {str(e)}")
+            logger.error("Error checking webhook event: %s", e)
             return False
 
-    async def mark_webhook_event_processed(self, event_id: str) -> None:
-        """Mark a webhook event as processed to prevent duplicate processing.
+    async def record_webhook_event(self, event: Dict[str, Any]) -> None:
+        """Persist a received webhook event before it is processed.
+
+        The row keeps the event type and payload with processed_at unset
+        until mark_webhook_event_processed is called once the event has been
+        handled or dead-lettered, so events whose background processing never
+        finished can be found and replayed. Recording is idempotent, so a
+        redelivery of an event whose row was already written succeeds.
 
         Args:
-            event_id: Stripe event ID
+            event: Verified Stripe event
+
+        Raises:
+            WebhookStoreError: If the row could not be written; the event must
+                then not be acknowledged, or it could be lost
         """
+        event_id = event.get("id")
+        logger.info("Recording webhook event %s", event_id)
 
-        logger.info(f"Marking webhook event {event_id} as processed")
+        if not settings.SUPABASE_SERVICE_ROLE_KEY:
+            logger.error("SUPABASE_SERVICE_ROLE_KEY is not configured")
+            raise WebhookStoreError("SUPABASE_SERVICE_ROLE_KEY is not configured")
 
         try:
-            if not settings.SUPABASE_SERVICE_ROLE_KEY:
-                logger.error("SUPABASE_SERVICE_ROLE_KEY is not configured")
-                return
-
             webhook_event = {
                 "event_id": event_id,
-                "processed_at": datetime.now().isoformat(),
-                "created_at": datetime.now().isoformat(),
+                "event_type": event.get("type"),
+                "payload": event,
+                "processed_at": None,
+                "created_at": datetime.now(timezone.utc).isoformat(),
             }
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{settings.SUPABASE_URL}/rest/v1/webhook_events",
-                    headers={
-                        "apikey": settings.SUPABASE_SERVICE_ROLE_KEY,
-                        "Authorization": f"Bearer {settings.SUPABASE_SERVICE_ROLE_KEY}",
-                        "Content-Type": "application/json",
-                        "Prefer": "return=representation",
-                    },
-                    json=webhook_event,
+            client = user_service.get_client()
+            response = await client.post(
+                WEBHOOK_EVENTS_PATH,
+                headers=IGNORE_DUPLICATES,
+                params={"on_conflict": "event_id"},
+                content=orjson.dumps(webhook_event),
+            )
+        except httpx.HTTPError as e:
+            logger.error("Error recording webhook event %s: %s", event_id, e)
+            raise WebhookStoreError(f"Error recording webhook event: {str(e)}")
+
+        if not response.is_success:
+            error_detail = "Failed to record webhook event"
+            try:
+                error_data = response.json()
+                if "message" in error_data:
+                    error_detail = error_data["message"]
+            except Exception:
+                pass
+
+            logger.error("Failed to record event %s: %s", event_id, error_detail)
+            raise WebhookStoreError(f"Failed to record webhook event: {error_detail}")
+
+        logger.info("Recorded webhook event %s", event_id)
+
+    async def mark_webhook_event_processed(self, event_id: str) -> None:
+        """Stamp a recorded webhook event as handled.
+
+        Args:
+            event_id: Stripe event ID
+
+        Raises:
+            WebhookStoreError: If the row could not be updated; the event is
+                then replayed later
+        """
+
+        logger.info("Marking webhook event %s as processed", event_id)
+
+        try:
+            client = user_service.get_client()
+            response = await client.patch(
+                WEBHOOK_EVENTS_PATH,
+                headers=RETURN_MINIMAL,
+                params={"event_id": f"eq.{event_id}"},
+                content=orjson.dumps(
+                    {"processed_at": datetime.now(timezone.utc).isoformat()}
+                ),
+            )
+        except httpx.HTTPError as e:
+            logger.error("Error marking webhook event %s as processed: %s", event_id, e)
+            raise WebhookStoreError(f"Error marking webhook event processed: {str(e)}")
+
+        if not response.is_success:
+            logger.error(
+                "Failed to mark event %s as processed: %s",
+                event_id,
+                response.status_code,
+            )
+            raise WebhookStoreError(
+                f"Failed to mark webhook event processed: {response.status_code}"
+            )
+
+        logger.info("Successfully marked event %s as processed", event_id)
+
+    async def get_unprocessed_webhook_events(
+        self, older_than: int = 600, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Fetch recorded webhook events whose processing never completed.
+
+        Args:
+            older_than: Only return events recorded at least this many seconds
+                ago, leaving in-flight background tasks alone
+            limit: Maximum number of events to return
+
+        Returns:
+            Stored event payloads, oldest first
+
+        Raises:
+            WebhookStoreError: If the events could not be fetched
+        """
+        cutoff = datetime.fromtimestamp(
+            time.time() - older_than, timezone.utc
+        ).isoformat()
+        try:
+            client = user_service.get_client()
+            response = await client.get(
+                WEBHOOK_EVENTS_PATH,
+                params={
+                    "select": "payload",
+                    "processed_at": "is.null",
+                    "created_at": f"lt.{cutoff}",
+                    "order": "created_at.asc",
+                    "limit": limit,
+                },
+            )
+        except httpx.HTTPError as e:
+            logger.error("Error fetching unprocessed webhook events: %s", e)
+            raise WebhookStoreError(
+                f"Error fetching unprocessed webhook events: {str(e)}"
+            )
+
+        if not response.is_success:
+            logger.error(
+                "Failed to fetch unprocessed webhook events: %s",
+                response.status_code,
+            )
+            raise WebhookStoreError(
+                f"Failed to fetch unprocessed webhook events: {response.status_code}"
+            )
+
+        return [row["payload"] for row in response.json() if row.get("payload")]
+
+    async def check_webhook_schema(self) -> None:
+        """Verify the tables and columns used for webhook bookkeeping exist.
+
+        They are created by WEBHOOK_SCHEMA_SQL. Without them received events
+        could not be recorded for replay, so a missing table or column is
+        raised instead of logged. An unreachable Supabase only logs a warning.
+
+        Raises:
+            WebhookStoreError: If Supabase reports a missing table or column
+        """
+        client = user_service.get_client()
+        for path, columns in WEBHOOK_SCHEMA.items():
+            try:
+                response = await client.get(
+                    path,
+                    params={"select": columns, "limit": 0},
+                    timeout=WEBHOOK_SCHEMA_CHECK_TIMEOUT,
                 )
+            except httpx.HTTPError as e:
+                logger.warning("Webhook schema check skipped: %s", e)
+                return
 
-                if response.status_code not in (201, 200):
-                    error_detail = "Failed to mark webhook event as processed"
-                    try:
-                        error_data = response.json()
-                        if "message" in error_data:
-                            error_detail = error_data["message"]
-                    except Exception:
-                        pass
-
-                    logger.error(
-                        f"Failed to mark event {event_id} as processed: {error_detail}"
-                    )
+            # PostgREST answers 400 for unknown columns and 404 for unknown tables
+            if response.status_code in (400, 404):
+                raise WebhookStoreError(
+                    f"{path} is missing or lacks columns {columns}; "
+                    f"apply {WEBHOOK_SCHEMA_SQL}: {response.text}"
+                )
+            if not response.is_success:
+                logger.warning(
+                    "Webhook schema check for %s failed: %s",
+                    path,
+                    response.status_code,
+                )
+
+    async def record_webhook_failure(
+        self, event: Dict[str, Any], error: str, attempts: int = 0
+    ) -> None:
+        """Dead-letter a webhook event whose handler failed.
 
-                else:
-                    logger.info(f"Successfully marked event {event_id} as processed")
+        The event is upserted into webhook_failures with its next retry time
+        backed off exponentially; after WEBHOOK_MAX_ATTEMPTS it is kept for
+        manual replay with no next retry.
 
-        except Exception as e:
-            logger.error(f"Error marking webhook event as processed: {str(e)}")
+        Args:
+            event: Stripe event that failed
+            error: Description of the failure
+            attempts: Failed attempts before this one
+
+        Raises:
+            WebhookStoreError: If the event could not be dead-lettered
+        """
+        event_id = event.get("id")
+        attempts += 1
+        next_retry_at = None
+        if attempts < WEBHOOK_MAX_ATTEMPTS:
+            delay = min(
+                WEBHOOK_RETRY_MAX_DELAY, WEBHOOK_RETRY_BASE_DELAY * 2**attempts
+            ) + random.uniform(0, WEBHOOK_RETRY_BASE_DELAY)
+            next_retry_at = datetime.fromtimestamp(
+                time.time() + delay, timezone.utc
+            ).isoformat()
+        else:
+            logger.error(
+                "Webhook event %s failed %s times, giving up retries",
+                event_id,
+                attempts,
+            )
+
+        try:
+            client = user_service.get_client()
+            response = await client.post(
+                WEBHOOK_FAILURES_PATH,
+                headers=MERGE_DUPLICATES,
+                params={"on_conflict": "event_id"},
+                content=orjson.dumps(
+                    {
+                        "event_id": event_id,
+                        "payload": event,
+                        "attempts": attempts,
+                        "next_retry_at": next_retry_at,
+                        "last_error": error,
+                    }
+                ),
+            )
+        except httpx.HTTPError as e:
+            logger.error("Error dead-lettering webhook event %s: %s", event_id, e)
+            raise WebhookStoreError(f"Error dead-lettering webhook event: {str(e)}")
+
+        if not response.is_success:
+            logger.error(
+                "Failed to dead-letter webhook event %s: %s",
+                event_id,
+                response.status_code,
+            )
+            raise WebhookStoreError(
+                f"Failed to dead-letter webhook event: {response.status_code}"
+            )
+
+    async def get_due_webhook_failures(
+        self, limit: int = 100
+    ) -> List[Tuple[Dict[str, Any], int]]:
+        """Fetch dead-lettered webhook events whose next retry is due.
+
+        Args:
+            limit: Maximum number of events to return
+
+        Returns:
+            (event payload, failed attempts) pairs, most overdue first
+
+        Raises:
+            WebhookStoreError: If the events could not be fetched
+        """
+        try:
+            client = user_service.get_client()
+            response = await client.get(
+                WEBHOOK_FAILURES_PATH,
+                params={
+                    "select": "payload,attempts",
+                    "next_retry_at": f"lt.{datetime.now(timezone.utc).isoformat()}",
+                    "order": "next_retry_at.asc",
+                    "limit": limit,
+                },
+            )
+        except httpx.HTTPError as e:
+            logger.error("Error fetching due webhook failures: %s", e)
+            raise WebhookStoreError(f"Error fetching due webhook failures: {str(e)}")
+
+        if not response.is_success:
+            logger.error(
+                "Failed to fetch due webhook failures: %s", response.status_code
+            )
+            raise WebhookStoreError(
+                f"Failed to fetch due webhook failures: {response.status_code}"
+            )
+        return [(row["payload"], row["attempts"]) for row in response.json()]
+
+    async def resolve_webhook_failure(self, event_id: str) -> None:
+        """Remove a dead-lettered webhook event after a successful retry.
+
+        Args:
+            event_id: Stripe event ID
+
+        Raises:
+            WebhookStoreError: If the dead-lettered row could not be removed
+        """
+        try:
+            client = user_service.get_client()
+            response = await client.delete(
+                WEBHOOK_FAILURES_PATH,
+                headers=RETURN_MINIMAL,
+                params={"event_id": f"eq.{event_id}"},
+            )
+        except httpx.HTTPError as e:
+            logger.error("Error resolving webhook failure %s: %s", event_id, e)
+            raise WebhookStoreError(f"Error resolving webhook failure: {str(e)}")
+
+        if not response.is_success:
+            logger.error(
+                "Failed to resolve webhook failure %s: %s",
+                event_id,
+                response.status_code,
+            )
+            raise WebhookStoreError(
+                f"Failed to resolve webhook failure: {response.status_code}"
+            )
+
+
+@lru_cache(maxsize=1)
+def get_stripe_service() -> StripeService:
+    """Return the process-wide StripeService, usable as a FastAPI dependency."""
+    return StripeService()
 
 
-stripe_service = StripeService()
+stripe_service = get_stripe_service()
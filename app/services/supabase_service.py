@@ -10,15 +10,90 @@ Supabase URL and service role key for authentication.
 
 from app.services.base_database_service import BaseDatabaseService
 from app.core.config import settings
-from supabase import create_client
-from typing import Dict, Any, Union, List
+from app.utils.orjson_http import OrjsonTransport
+from app.utils.request_cache import request_query_cache
+from app.utils.retry import retry_async
+from app.utils.ttl_cache import TTLCache
+from supabase import AsyncClient, acreate_client
+from postgrest.exceptions import APIError
+from postgrest.types import ReturnMethod
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+from collections import defaultdict
+import asyncio
+import httpx
 import logging
+import orjson
+import re
+import weakref
+
+try:
+    import asyncpg
+except ImportError:  # direct Postgres reads are optional
+    asyncpg = None
 
 logger = logging.getLogger(__name__)
 
+# pool for PostgREST calls; supabase-py's default limits are too small for the
+# number of concurrent requests the API serves and surface as PoolTimeout
+POSTGREST_LIMITS = httpx.Limits(
+    max_connections=60, max_keepalive_connections=40, keepalive_expiry=60
+)
+POSTGREST_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+
+# read-through cache for select_data/rpc calls made with cache=True
+QUERY_CACHE_SIZE = 1024
+QUERY_CACHE_TTL = 30
+
+# errors raised before the request reached PostgREST, safe to retry any call
+UNSENT_ERRORS = (httpx.PoolTimeout, httpx.ConnectTimeout, httpx.ConnectError)
+# errors that leave the connection unusable; the client is rebuilt before retrying
+BROKEN_CONNECTION_ERRORS = (
+    httpx.ConnectError,
+    httpx.ReadError,
+    httpx.RemoteProtocolError,
+)
+# gateway errors and PostgREST's "could not connect to the database" codes
+TRANSIENT_API_CODES = {"500", "502", "503", "504", "PGRST000", "PGRST001", "PGRST002"}
+
+
+# direct reads through Supabase's transaction pooler (Supavisor), which does not
+# support prepared statements across transactions, hence no statement cache
+PG_POOL_MIN_SIZE = 2
+PG_POOL_MAX_SIZE = 10
+PG_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _is_transient_error(error: Exception) -> bool:
+    """Whether error is a network or upstream failure worth retrying."""
+    if isinstance(error, UNSENT_ERRORS + BROKEN_CONNECTION_ERRORS):
+        return True
+    return isinstance(error, APIError) and str(error.code) in TRANSIENT_API_CODES
+
+
+def _is_unsent_error(error: Exception) -> bool:
+    """Whether error happened before the request was sent."""
+    return isinstance(error, UNSENT_ERRORS)
+
+
+class SupabaseException(Exception):
+    """
+    Raised when a Supabase operation fails.
+
+    Attributes:
+        op: The operation that failed, e.g. "update" or "rpc"
+        table: The table, or function for rpc, it was run against
+        cause: The underlying error
+    """
+
+    def __init__(self, op: str, table: str, cause: Optional[BaseException] = None):
+        super().__init__(f"Supabase {op} on {table} failed")
+        self.op = op
+        self.table = table
+        self.cause = cause
 
-class SupbaseException(Exception):
-    pass
+
+# misspelled name kept for existing imports
+SupbaseException = SupabaseException
 
 
 class SupabaseService(BaseDatabaseService):
@@ -30,16 +105,228 @@ class SupabaseService(BaseDatabaseService):
     It utilizes the official Supabase Python client library.
     """
 
+    # async clients shared by every instance, one per event loop: pooled
+    # connections are reused instead of re-handshaking per instance, and
+    # callers that drive their own loop (asyncio.run in tasks) never touch
+    # connections bound to another loop
+    _clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = (
+        weakref.WeakKeyDictionary()
+    )
+    # cached select results keyed by query, and the keys cached per table so
+    # writes through this service can drop them
+    _query_cache = TTLCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+    _table_keys: Dict[str, set] = defaultdict(set)
+    # asyncpg pools for direct reads, one per event loop like the clients
+    _pg_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+        weakref.WeakKeyDictionary()
+    )
+
     def __init__(self):
         """
         Initializes the SupabaseService with the Supabase URL and service role key
-        from the application settings, and creates a Supabase client instance.
+        from the application settings. The async client is created on first use.
         """
         self.base_url = settings.SUPABASE_URL
         self.api_key = settings.SUPABASE_SERVICE_ROLE_KEY
-        self.supabase_client = create_client(self.base_url, self.api_key)
+        self.db_url = settings.SUPABASE_DB_URL
 
-    def update_data(
+    async def _get_client(self) -> AsyncClient:
+        """
+        Returns the Supabase async client for the running event loop, creating
+        it on first use.
+        """
+        loop = asyncio.get_running_loop()
+        client = SupabaseService._clients.get(loop)
+        if client is None:
+            client = await acreate_client(self.base_url, self.api_key)
+            await self._attach_pooled_session(client)
+            SupabaseService._clients[loop] = client
+        return client
+
+    @staticmethod
+    async def _attach_pooled_session(client: AsyncClient) -> None:
+        """
+        Replaces the PostgREST session built by supabase-py with one using
+        POSTGREST_LIMITS and POSTGREST_TIMEOUT, keeping its URL and auth headers.
+        Response bodies are decoded with orjson.
+        """
+        postgrest = client.postgrest
+        default_session = postgrest.session
+        postgrest.session = httpx.AsyncClient(
+            base_url=default_session.base_url,
+            headers=default_session.headers,
+            transport=OrjsonTransport(limits=POSTGREST_LIMITS, http2=True),
+            timeout=POSTGREST_TIMEOUT,
+            follow_redirects=True,
+        )
+        await default_session.aclose()
+
+    async def _reset_client(self, client: AsyncClient) -> None:
+        """
+        Discards client if it is still the one for the running event loop, so
+        the next call builds a fresh client and connection pool.
+        """
+        loop = asyncio.get_running_loop()
+        if SupabaseService._clients.get(loop) is client:
+            del SupabaseService._clients[loop]
+            await client.postgrest.aclose()
+
+    async def _execute(
+        self, build_request: Callable[[AsyncClient], Any], idempotent: bool = True
+    ) -> Any:
+        """
+        Builds a request with build_request and executes it, retrying transient
+        failures with jittered backoff.
+
+        Args:
+            build_request: Returns the PostgREST request to execute for a client
+            idempotent: Whether the request may be repeated after it reached the
+                server; otherwise only errors raised before sending are retried
+        """
+        client = None
+
+        async def attempt():
+            nonlocal client
+            client = await self._get_client()
+            return await build_request(client).execute()
+
+        async def reconnect(error: Exception) -> None:
+            if isinstance(error, BROKEN_CONNECTION_ERRORS):
+                await self._reset_client(client)
+
+        return await retry_async(
+            attempt,
+            retry_on=_is_transient_error if idempotent else _is_unsent_error,
+            before_retry=reconnect,
+        )
+
+    def _can_select_directly(self, table_name: str, query: str, cols) -> bool:
+        """
+        Whether a select can bypass PostgREST: asyncpg and SUPABASE_DB_URL are
+        available and the query is a plain column list with exact-match filters.
+        """
+        if asyncpg is None or not self.db_url:
+            return False
+        columns = [c.strip() for c in query.split(",")]
+        names = [table_name, *(cols or {})]
+        if columns != ["*"]:
+            names.extend(columns)
+        return all(PG_IDENTIFIER.match(name) for name in names)
+
+    async def _get_pg_pool(self):
+        """
+        Returns the asyncpg pool for the running event loop, creating it on
+        first use.
+        """
+        loop = asyncio.get_running_loop()
+        pool = SupabaseService._pg_pools.get(loop)
+        if pool is None:
+            pool = await asyncpg.create_pool(
+                self.db_url,
+                min_size=PG_POOL_MIN_SIZE,
+                max_size=PG_POOL_MAX_SIZE,
+                statement_cache_size=0,
+            )
+            SupabaseService._pg_pools[loop] = pool
+        return pool
+
+    async def _select_directly(
+        self, table_name: str, query: str, cols: Optional[Dict]
+    ) -> List[Dict[str, Any]]:
+        """
+        Runs a select over asyncpg. Rows are serialized by Postgres with
+        row_to_json so values come back in the same JSON form PostgREST uses.
+        """
+        columns = (
+            "*"
+            if query.strip() == "*"
+            else ", ".join(f'"{c.strip()}"' for c in query.split(","))
+        )
+        filters = list((cols or {}).items())
+        where = " AND ".join(
+            f'"{name}" = ${i}' for i, (name, _) in enumerate(filters, 1)
+        )
+        sql = f'SELECT {columns} FROM "{table_name}"'
+        if where:
+            sql += f" WHERE {where}"
+
+        pool = await self._get_pg_pool()
+        rows = await pool.fetch(
+            f"SELECT row_to_json(t)::text FROM ({sql}) t",
+            *(value for _, value in filters),
+        )
+        return [orjson.loads(row[0]) for row in rows]
+
+    def _cache_result(
+        self, key: tuple, result: Any, table_name: Optional[str] = None
+    ) -> None:
+        """
+        Stores a query result, indexing it under table_name for invalidation.
+        """
+        SupabaseService._query_cache.set(key, result)
+        if table_name is None:
+            return
+        keys = SupabaseService._table_keys[table_name]
+        if len(keys) >= QUERY_CACHE_SIZE:
+            # forget keys the cache has already evicted or expired
+            keys.intersection_update(
+                [k for k in keys if k in SupabaseService._query_cache]
+            )
+        keys.add(key)
+
+    def _invalidate_table(self, table_name: str) -> None:
+        """
+        Drops every cached select result for table_name, and the current
+        request's memo since its reads may depend on the written rows.
+        """
+        for key in SupabaseService._table_keys.pop(table_name, ()):
+            SupabaseService._query_cache.invalidate(key)
+        memo = request_query_cache.get()
+        if memo:
+            memo.clear()
+
+    @staticmethod
+    def _select_key(
+        table_name: str, query: str, cols: Optional[Dict]
+    ) -> Optional[tuple]:
+        """
+        Returns the cache key for a select, or None if a filter value is
+        unhashable and the result cannot be cached.
+        """
+        filters = tuple(sorted(cols.items())) if cols else ()
+        key = ("select", table_name, query, filters)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    @staticmethod
+    def _rpc_key(function_name: str, params: Optional[Dict]) -> Optional[tuple]:
+        """
+        Returns the cache key for an rpc call, or None if a parameter is
+        unhashable, e.g. a list or dict, and the result cannot be cached.
+        """
+        key = ("rpc", function_name, tuple(sorted((params or {}).items())))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    async def aclose(self) -> None:
+        """
+        Closes the client for the running event loop and its pooled connections.
+        """
+        loop = asyncio.get_running_loop()
+        client = SupabaseService._clients.pop(loop, None)
+        if client is not None:
+            await client.postgrest.aclose()
+        pool = SupabaseService._pg_pools.pop(loop, None)
+        if pool is not None:
+            await pool.close()
+
+    async def update_data(
         self, table_name: str, data: Dict, **kwargs
     ) -> Dict[str, Any]:
         """
@@ -50,67 +337,69 @@ class SupabaseService(BaseDatabaseService):
             data (Dict): A dictionary containing the column names and their new values.
             **kwargs: Additional keyword arguments. Must include 'cols' which is a
                       dictionary of column names and values to filter the update.
+                - 'returning' (Optional[str]): 'representation' (default) to return
+                  the updated rows, or 'minimal' to skip sending them back.
 
         Returns:
-            Dict[str, Any]: The response from the Supabase update operation.
+            Dict[str, Any]: The 'data' and 'count' of the Supabase update response.
 
         Raises:
-            SupbaseException: If an error occurs during the Supabase update operation.
+            SupabaseException: If an error occurs during the Supabase update operation.
         """
         try:
-            logger.info(f"Updating table {table_name} with data: {data}")
+            logger.info("Updating table %s", table_name)
+            logger.debug("Update payload for %s: %s", table_name, data)
             # dict of column names and values to filter
             cols = kwargs["cols"]
-            response = (
-                self.supabase_client.table(table_name)
-                .update(data)
+            returning = ReturnMethod(kwargs.get("returning", "representation"))
+            response = await self._execute(
+                lambda client: client.table(table_name)
+                .update(data, returning=returning)
                 .match(cols)
-                .execute()
-                .model_dump()
             )
-            return response
+            self._invalidate_table(table_name)
+            return {"data": response.data, "count": response.count}
         except Exception as e:
             logger.error(f"Failed to update table {table_name} with error: {str(e)}")
-            raise SupbaseException(
-                f"An error occured while updating table: {table_name}"
-            )
+            raise SupabaseException("update", table_name, e) from e
 
-    def insert_data(
-        self, table_name: str, data: Dict, **kwargs
+    async def insert_data(
+        self, table_name: str, data: Union[Dict, List[Dict]], **kwargs
     ) -> Dict[str, Any]:
         """
-        Inserts a new record into the specified Supabase table.
+        Inserts one or more new records into the specified Supabase table.
 
         Args:
             table_name (str): The name of the Supabase table to insert into.
-            data (Dict): A dictionary containing the column names and their values for the new record.
+            data (Union[Dict, List[Dict]]): A dictionary containing the column names and their values for the new record,
+                or a list of them to insert every record in a single request.
             **kwargs: Additional keyword arguments (currently not used in this implementation).
 
         Returns:
-            Dict[str, Any]: The response from the Supabase insert operation.
+            Dict[str, Any]: The 'data' and 'count' of the Supabase insert response.
 
         Raises:
-            SupbaseException: If an error occurs during the Supabase insert operation.
+            SupabaseException: If an error occurs during the Supabase insert operation.
         """
         try:
-            logger.info(f"Inserting into table {table_name} with data: {data}")
-            response = (
-                self.supabase_client.table(table_name)
-                .insert(data)
-                .execute()
-                .model_dump()
+            rows = len(data) if isinstance(data, list) else 1
+            logger.info("Inserting %s rows into table %s", rows, table_name)
+            logger.debug("Insert payload for %s: %s", table_name, data)
+            # a retried insert could create duplicate rows
+            response = await self._execute(
+                lambda client: client.table(table_name).insert(data),
+                idempotent=False,
             )
-            return response
+            self._invalidate_table(table_name)
+            return {"data": response.data, "count": response.count}
         except Exception as e:
             logger.error(
                 f"Failed to insert data into table {table_name} with error: {str(e)}"
             )
-            raise SupbaseException(
-                f"An error occured while inserting into table: {table_name}"
-            )
+            raise SupabaseException("insert", table_name, e) from e
 
-    def upsert_data(
-        self, table_name: str, data: Dict, **kwargs
+    async def upsert_data(
+        self, table_name: str, data: Union[Dict, List[Dict]], **kwargs
     ) -> Dict[str, Any]:
         """
         Inserts a new record or updates an existing record in the specified Supabase table.
@@ -120,31 +409,30 @@ class SupabaseService(BaseDatabaseService):
 
         Args:
             table_name (str): The name of the Supabase table to upsert into.
-            data (Dict): A dictionary containing the column names and their values.
+            data (Union[Dict, List[Dict]]): A dictionary containing the column names and their values,
+                or a list of them to upsert every record in a single request.
             **kwargs: Additional keyword arguments (currently not used in this implementation).
 
         Returns:
-            Dict[str, Any]: The response from the Supabase upsert operation.
+            Dict[str, Any]: The 'data' and 'count' of the Supabase upsert response.
 
         Raises:
-            SupbaseException: If an error occurs during the Supabase upsert operation.
+            SupabaseException: If an error occurs during the Supabase upsert operation.
         """
         try:
-            logger.info(f"Upserting table {table_name} with data: {data}")
-            response = (
-                self.supabase_client.table(table_name)
-                .upsert(data)
-                .execute()
-                .model_dump()
+            rows = len(data) if isinstance(data, list) else 1
+            logger.info("Upserting %s rows into table %s", rows, table_name)
+            logger.debug("Upsert payload for %s: %s", table_name, data)
+            response = await self._execute(
+                lambda client: client.table(table_name).upsert(data)
             )
-            return response
+            self._invalidate_table(table_name)
+            return {"data": response.data, "count": response.count}
         except Exception as e:
             logger.error(f"Failed to upsert table {table_name} with error: {str(e)}")
-            raise SupbaseException(
-                f"An error occured while upserting table: {table_name}"
-            )
+            raise SupabaseException("upsert", table_name, e) from e
 
-    def delete_data(self, table_name: str, **kwargs) -> Dict[str, Any]:
+    async def delete_data(self, table_name: str, **kwargs) -> Dict[str, Any]:
         """
         Deletes records from the specified Supabase table that match the given criteria.
 
@@ -154,31 +442,61 @@ class SupabaseService(BaseDatabaseService):
                       dictionary of column names and values to filter the deletion.
 
         Returns:
-            Dict[str, Any]: The response from the Supabase delete operation.
+            Dict[str, Any]: The 'data' and 'count' of the Supabase delete response.
 
         Raises:
-            SupbaseException: If an error occurs during the Supabase delete operation.
+            SupabaseException: If an error occurs during the Supabase delete operation.
         """
         try:
-            logger.info(f"Deleting data from table {table_name}")
+            logger.info("Deleting data from table %s", table_name)
             cols = kwargs["cols"]
-            response = (
-                self.supabase_client.table(table_name)
-                .delete()
-                .match(cols)
-                .execute()
-                .model_dump()
+            response = await self._execute(
+                lambda client: client.table(table_name).delete().match(cols)
             )
-            return response
+            self._invalidate_table(table_name)
+            return {"data": response.data, "count": response.count}
         except Exception as e:
             logger.error(
                 f"Failed to delete data from {table_name} with error: {str(e)}"
             )
-            raise SupbaseException(
-                f"An error occured while deleting data from table: {table_name}"
+            raise SupabaseException("delete", table_name, e) from e
+
+    async def delete_many(
+        self, table_name: str, column: str, values: List[Any]
+    ) -> Dict[str, Any]:
+        """
+        Deletes every record in the specified Supabase table whose column value is
+        one of values, in a single request.
+
+        Args:
+            table_name (str): The name of the Supabase table to delete from.
+            column (str): The column to filter on.
+            values (List[Any]): The values of column whose rows are deleted.
+
+        Returns:
+            Dict[str, Any]: The 'data' and 'count' of the Supabase delete response.
+
+        Raises:
+            SupabaseException: If an error occurs during the Supabase delete operation.
+        """
+        if not values:
+            return {"data": [], "count": None}
+        try:
+            logger.info("Deleting %s rows from table %s", len(values), table_name)
+            response = await self._execute(
+                lambda client: client.table(table_name)
+                .delete()
+                .in_(column, list(values))
+            )
+            self._invalidate_table(table_name)
+            return {"data": response.data, "count": response.count}
+        except Exception as e:
+            logger.error(
+                f"Failed to delete data from {table_name} with error: {str(e)}"
             )
+            raise SupabaseException("delete", table_name, e) from e
 
-    def select_data(self, table_name, **kwargs) -> Union[List[Any], str]:
+    async def select_data(self, table_name, **kwargs) -> List[Dict[str, Any]]:
         """
         Fetches records from the specified Supabase table based on the provided criteria.
 
@@ -187,67 +505,151 @@ class SupabaseService(BaseDatabaseService):
             **kwargs: Additional keyword arguments.
                 - 'query' (Optional[str]): The columns to select (defaults to '*').
                 - 'cols' (Dict): A dictionary of column names and values to filter the selection using exact matching.
+                - 'cache' (bool): Serve the result from the query cache for up to
+                  QUERY_CACHE_TTL seconds. Writes made through this service to
+                  the table drop the cached results. Cached rows are shared, so
+                  callers must not mutate them.
+
+        Within an HTTP request, identical selects are answered from a per-request
+        memo (see app.utils.request_cache) until a write goes through this service.
 
         Returns:
-            Dict[str, Any]: The response from the Supabase select operation.
+            List[Dict[str, Any]]: The matching rows; empty if nothing matched.
 
         Raises:
-            SupbaseException: If an error occurs during the Supabase select operation.
+            SupabaseException: If an error occurs during the Supabase select operation.
         """
 
         try:
-            logger.info(f"Fetching data from table {table_name}")
+            logger.info("Fetching data from table %s", table_name)
             query = kwargs.get("query", "*")
             cols = kwargs.get("cols", None)
-            if cols:
-                response = (
-                    self.supabase_client.table(table_name)
-                    .select(query)
-                    .match(cols)
-                    .execute()
-                    .model_dump()
-                )
+            key = self._select_key(table_name, query, cols)
+            cache = kwargs.get("cache", False) and key is not None
+            # rows already read during this request; copied so a caller
+            # modifying its rows does not affect later reads
+            memo = request_query_cache.get() if key is not None else None
+            if memo is not None and key in memo:
+                return [dict(row) for row in memo[key]]
+            if cache:
+                cached = SupabaseService._query_cache.get(key)
+                if cached is not None:
+                    return cached
+
+            if self._can_select_directly(table_name, query, cols):
+                result = await self._select_directly(table_name, query, cols)
             else:
-                response = (
-                    self.supabase_client.table(table_name)
-                    .select(query)
-                    .execute()
-                    .model_dump()
-                )
-            return response.get("data", [])
+
+                def build_request(client: AsyncClient):
+                    request = client.table(table_name).select(query)
+                    return request.match(cols) if cols else request
+
+                response = await self._execute(build_request)
+                result = response.data or []
+            if memo is not None:
+                memo[key] = [dict(row) for row in result]
+            if cache:
+                self._cache_result(key, result, table_name)
+            return result
         except Exception as e:
             logger.error(f"Failed to fetch data from {table_name} with error: {str(e)}")
-            raise SupbaseException(
-                f"An error occured while fetching data from table: {table_name}"
-            )
-        
-    def rpc(self, function_name: str, params: Dict = None, **kwargs) -> Union[List[Any], Dict[str, Any]]:
+            raise SupabaseException("select", table_name, e) from e
+
+    async def select_stream(
+        self,
+        table_name: str,
+        *,
+        query: str = "*",
+        cols: Optional[Dict] = None,
+        order: str = "id",
+        page_size: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields records from the specified Supabase table one page at a time, so
+        only page_size rows are held in memory.
+
+        Args:
+            table_name (str): The name of the Supabase table to select from.
+            query (str): The columns to select (defaults to '*').
+            cols (Optional[Dict]): Column names and values to filter on using exact matching.
+            order (str): Column to page by; must give a stable order (defaults to 'id').
+            page_size (int): Rows fetched per request.
+
+        Yields:
+            Dict[str, Any]: Each matching row.
+
+        Raises:
+            SupabaseException: If an error occurs fetching a page.
+        """
+        offset = 0
+        while True:
+
+            def build_request(client: AsyncClient):
+                request = client.table(table_name).select(query)
+                if cols:
+                    request = request.match(cols)
+                return request.order(order).range(offset, offset + page_size - 1)
+
+            try:
+                logger.info(
+                    "Fetching rows %s-%s from table %s",
+                    offset,
+                    offset + page_size - 1,
+                    table_name,
+                )
+                response = await self._execute(build_request)
+            except Exception as e:
+                logger.error(
+                    f"Failed to fetch data from {table_name} with error: {str(e)}"
+                )
+                raise SupabaseException("select", table_name, e) from e
+
+            rows = response.data or []
+            for row in rows:
+                yield row
+            if len(rows) < page_size:
+                return
+            offset += page_size
+
+    async def rpc(self, function_name: str, params: Dict = None, **kwargs) -> Union[List[Any], Dict[str, Any]]:
         """
         Calls a stored PostgreSQL function via Supabase's RPC endpoint.
 
         Args:
             function_name (str): The name of the PostgreSQL function to call
             params (Dict, optional): Parameters to pass to the function
-            **kwargs: Additional keyword arguments for future extensions
+            **kwargs: Additional keyword arguments.
+                - 'cache' (bool): Serve the result from the query cache for up to
+                  QUERY_CACHE_TTL seconds. Not invalidated by writes, so only use
+                  it for functions whose results may be that stale. Empty results
+                  and calls with unhashable params are never cached.
 
         Returns:
             Union[List[Any], Dict[str, Any]]: The response from the function call
 
         Raises:
-            SupbaseException: If an error occurs during the RPC call
+            SupabaseException: If an error occurs during the RPC call
         """
         try:
-            logger.info(f"Calling RPC function {function_name} with params: {params}")
+            logger.info("Calling RPC function %s with params: %s", function_name, params)
             
-            # Call the function with parameters if provided
-            if params:
-                response = self.supabase_client.rpc(function_name, params).execute().model_dump()
-            else:
-                response = self.supabase_client.rpc(function_name).execute().model_dump()
-            
-            return response.get("data", [])
+            key = self._rpc_key(function_name, params)
+            cache = kwargs.get("cache", False) and key is not None
+            if cache:
+                cached = SupabaseService._query_cache.get(key)
+                if cached is not None:
+                    return cached
+
+            response = await self._execute(
+                lambda client: client.rpc(function_name, params)
+            )
+            result = response.data
+            # an empty result may be filled in shortly, e.g. by a scrape it triggers
+            if cache and result:
+                self._cache_result(key, result)
+            return result
         
         except Exception as e:
             error_msg = f"Failed to execute RPC function {function_name} with error: {str(e)}"
             logger.error(error_msg)
-            raise SupbaseException(error_msg)
+            raise SupabaseException("rpc", function_name, e) from e
@@ -3,36 +3,92 @@
 This module provides functions to manage user profiles in the database.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Awaitable, BinaryIO, Callable, Optional, Tuple
+import asyncio
 import logging
-from datetime import datetime, timedelta
+import weakref
+from types import MappingProxyType
+from datetime import datetime, timedelta, timezone
 import random
 import hashlib
 
 import httpx
+import orjson
 from fastapi import HTTPException, status
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.core.config import settings
 from app.models.user import (
     UpdateUserProfileRequest,
+    UserPreferences,
     UserProfile,
     HeightUnitPreference,
     WeightUnitPreference,
 )
-from app.utils.helper_functions import remove_null_values
 from app.utils.constants import CM_TO_FEET, FEET_TO_CM, KG_TO_LBS, LBS_TO_KG
 from app.utils.file_upload import (
     upload_file_to_bucket,
     generate_avatar_path,
     validate_image_file,
 )
+from app.utils.orjson_http import OrjsonTransport
 from app.utils.slack import send_slack_alert
-
-import time
+from app.utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# pool shared by every call to Supabase's REST and auth APIs; over HTTP/2
+# concurrent requests multiplex onto a few connections to the single host
+SUPABASE_HTTP_LIMITS = httpx.Limits(
+    max_connections=128, max_keepalive_connections=32, keepalive_expiry=60.0
+)
+SUPABASE_HTTP_TIMEOUT = 30.0
+SUPABASE_WARM_UP_TIMEOUT = 5.0
+
+# paths relative to the shared client's base_url (settings.SUPABASE_URL)
+REST_PATH = "/rest/v1"
+USER_PROFILES_PATH = f"{REST_PATH}/user_profiles"
+USER_PREFERENCES_PATH = f"{REST_PATH}/user_preferences"
+SESSION_TOKENS_PATH = f"{REST_PATH}/session_tokens"
+OTP_PATH = f"{REST_PATH}/otp"
+AUTH_ADMIN_USERS_PATH = "/auth/v1/admin/users"
+AUTH_HEALTH_PATH = "/auth/v1/health"
+
+# per-call headers for writes: representation when the changed rows are used,
+# minimal when they are not; auth and content type are set on the shared client
+RETURN_REPRESENTATION = MappingProxyType({"Prefer": "return=representation"})
+RETURN_MINIMAL = MappingProxyType({"Prefer": "return=minimal"})
+
+# profiles and preferences are read on most requests (auth_guard loads the
+# profile every time) but change rarely; writers in this process invalidate them
+USER_CACHE_SIZE = 10000
+USER_CACHE_TTL = 60
+
+# columns read for profiles and preferences, limited to what the models expose,
+# and for OTP entries, limited to what verification checks
+PROFILE_COLUMNS = ",".join(UserProfile.model_fields)
+PREFERENCES_COLUMNS = ",".join(UserPreferences.model_fields)
+OTP_COLUMNS = "email,otp_hash,expires_at"
+
+
+def _error_detail(response: httpx.Response, default: str) -> str:
+    """Return the message of a Supabase error response, or default.
+
+    Args:
+        response: Failed response from the REST or auth API
+        default: Detail to use when the body carries no message
+
+    Returns:
+        Error detail for logging
+    """
+    try:
+        body = response.json()
+    except Exception:
+        return default
+    if isinstance(body, dict) and "message" in body:
+        return body["message"]
+    return default
+
 
 class UserProfileData(BaseModel):
     """User profile data model.
@@ -48,7 +104,7 @@ class UserProfileData(BaseModel):
     email: str
     display_name: Optional[str] = None
     fcm_token: Optional[str] = None
-    created_at: datetime = datetime.now()
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
 class UserProfileService:
@@ -62,6 +118,128 @@ class UserProfileService:
             raise ValueError("SUPABASE_SERVICE_ROLE_KEY is required")
 
         self.api_key: str = settings.SUPABASE_SERVICE_ROLE_KEY
+        self._headers = {
+            "apikey": self.api_key,
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        # one pooled client per event loop, so keep-alive connections are reused
+        # across requests while scheduler jobs running their own loop get theirs
+        self._clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._profile_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+        self._preferences_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+        # reads currently in flight per event loop and user, shared by every
+        # concurrent caller asking for the same user
+        self._inflight_profiles: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._inflight_preferences: weakref.WeakKeyDictionary = (
+            weakref.WeakKeyDictionary()
+        )
+        # bumped by invalidate_user_cache per user (None: every user); a read
+        # only caches its row if no invalidation happened while it was in flight
+        self._cache_generations: Dict[Optional[str], int] = {}
+
+    def get_client(self) -> httpx.AsyncClient:
+        """Return the pooled Supabase HTTP client for the running event loop.
+
+        The client sends the service role auth and JSON content type headers
+        and resolves paths against settings.SUPABASE_URL; other services
+        calling Supabase's REST API share it rather than opening their own.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                transport=OrjsonTransport(limits=SUPABASE_HTTP_LIMITS, http2=True),
+                base_url=self.base_url,
+                timeout=SUPABASE_HTTP_TIMEOUT,
+                headers=self._headers,
+            )
+            self._clients[loop] = client
+        return client
+
+    def invalidate_user_cache(self, user_id: Optional[str] = None) -> None:
+        """Drop the cached profile and preferences of a user, or of every user.
+
+        Args:
+            user_id: Supabase user ID, or None when the changed user is not known
+        """
+        if user_id is None:
+            self._profile_cache.clear()
+            self._preferences_cache.clear()
+            # the global bump outdates every per-user generation as well
+            self._cache_generations = {None: self._cache_generations.get(None, 0) + 1}
+        else:
+            self._profile_cache.invalidate(user_id)
+            self._preferences_cache.invalidate(user_id)
+            self._cache_generations[user_id] = (
+                self._cache_generations.get(user_id, 0) + 1
+            )
+        # reads started before the change must not be joined by later callers
+        for inflight in (self._inflight_profiles, self._inflight_preferences):
+            for pending in inflight.values():
+                if user_id is None:
+                    pending.clear()
+                else:
+                    pending.pop(user_id, None)
+
+    def _cache_generation(self, user_id: str) -> Tuple[int, int]:
+        """Return the invalidation state a read of user_id's rows starts from."""
+        return (
+            self._cache_generations.get(None, 0),
+            self._cache_generations.get(user_id, 0),
+        )
+
+    async def _single_flight(
+        self,
+        inflight: weakref.WeakKeyDictionary,
+        key: str,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Run fetch once for all concurrent callers asking for the same key.
+
+        Args:
+            inflight: Per-loop map of the reads currently in flight
+            key: Identifies the read, e.g. the user ID
+            fetch: Coroutine function performing the read
+
+        Returns:
+            A copy of the fetched record for this caller
+        """
+        loop = asyncio.get_running_loop()
+        pending = inflight.setdefault(loop, {})
+        task = pending.get(key)
+        if task is None:
+            task = loop.create_task(fetch())
+            pending[key] = task
+
+            def _done(finished: asyncio.Task) -> None:
+                if pending.get(key) is finished:
+                    del pending[key]
+
+            task.add_done_callback(_done)
+        # shielded so one caller being cancelled does not fail the others
+        return dict(await asyncio.shield(task))
+
+    async def warm_up(self) -> None:
+        """Open the pooled connection to Supabase before the first request needs it.
+
+        Over HTTP/2 one connection carries every request, so a single cheap call
+        pays the DNS, TCP and TLS setup. Failures are logged and ignored; the
+        first real call then connects as before.
+        """
+        try:
+            await self.get_client().get(
+                AUTH_HEALTH_PATH, timeout=SUPABASE_WARM_UP_TIMEOUT
+            )
+            logger.info("Supabase connection warmed up")
+        except httpx.HTTPError as e:
+            logger.warning(f"Supabase connection warm-up failed: {str(e)}")
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client for the running event loop."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
 
     async def create_profile(self, profile_data: UserProfileData) -> Dict[str, Any]:
         """Create a new user profile in the database.
@@ -89,37 +267,26 @@ class UserProfileService:
                 "fcm_token": profile_data.fcm_token,
             }
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/rest/v1/user_profiles",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "Prefer": "return=representation",
-                    },
-                    json=profile_record,
-                )
-
-                if response.status_code not in (201, 200):
-                    error_detail = "Failed to create user profile"
-                    try:
-                        error_data = response.json()
-                        if "message" in error_data:
-                            error_detail = error_data["message"]
-                    except Exception:
-                        pass
+            client = self.get_client()
+            response = await client.post(
+                USER_PROFILES_PATH,
+                headers=RETURN_REPRESENTATION,
+                content=orjson.dumps(profile_record),
+            )
 
-                    logger.error(f"Profile creation failed: {error_detail}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Failed to create user profile",
-                    )
+            if not response.is_success:
+                error_detail = _error_detail(response, "Failed to create user profile")
 
-                logger.info(
-                    f"Profile created successfully for user: {profile_data.user_id}"
+                logger.error(f"Profile creation failed: {error_detail}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to create user profile",
                 )
-                return response.json()
+
+            logger.info(
+                f"Profile created successfully for user: {profile_data.user_id}"
+            )
+            return response.json()
 
         except httpx.RequestError as e:
             logger.error(f"Request error creating profile: {str(e)}")
@@ -149,6 +316,7 @@ class UserProfileService:
         logger.info(f"Creating default preferences for user: {user_id}")
 
         try:
+            now = datetime.now(timezone.utc).isoformat()
             default_preferences = {
                 "user_id": user_id,
                 "dietary_restrictions": [],
@@ -158,39 +326,31 @@ class UserProfileService:
                 "protein_target": 0,
                 "carbs_target": 0,
                 "fat_target": 0,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat(),
+                "created_at": now,
+                "updated_at": now,
             }
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/rest/v1/user_preferences",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "Prefer": "return=representation",
-                    },
-                    json=default_preferences,
-                )
+            client = self.get_client()
+            response = await client.post(
+                USER_PREFERENCES_PATH,
+                headers=RETURN_REPRESENTATION,
+                content=orjson.dumps(default_preferences),
+            )
 
-                if response.status_code not in (201, 200):
-                    error_detail = "Failed to create user preferences"
-                    try:
-                        error_data = response.json()
-                        if "message" in error_data:
-                            error_detail = error_data["message"]
-                    except Exception:
-                        pass
+            if not response.is_success:
+                error_detail = _error_detail(
+                    response, "Failed to create user preferences"
+                )
 
-                    logger.error(f"Preferences creation failed: {error_detail}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Failed to create user preferences",
-                    )
+                logger.error(f"Preferences creation failed: {error_detail}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to create user preferences",
+                )
 
-                logger.info(f"Default preferences created for user: {user_id}")
-                return response.json()
+            self.invalidate_user_cache(user_id)
+            logger.info(f"Default preferences created for user: {user_id}")
+            return response.json()
 
         except httpx.RequestError as e:
             logger.error(f"Request error creating preferences: {str(e)}")
@@ -205,6 +365,47 @@ class UserProfileService:
                 detail=f"Error creating user preferences",
             )
 
+    async def provision_user(self, profile_data: UserProfileData) -> Dict[str, Any]:
+        """Set up a new user: profile, default preferences and verification email.
+
+        The profile is written first because the other rows reference it; the
+        preferences insert and the verification email then run concurrently.
+        A failure to send the verification email is logged, not raised, since
+        the user can request a new code.
+
+        Args:
+            profile_data: User profile data to be stored
+
+        Returns:
+            Dict with the created "profile" and "preferences" records
+
+        Raises:
+            HTTPException: If the profile or preferences cannot be created
+        """
+        profile = await self.create_profile(profile_data)
+        preferences, _ = await asyncio.gather(
+            self.create_default_preferences(profile_data.user_id),
+            self._send_signup_verification(profile_data),
+        )
+        return {"profile": profile, "preferences": preferences}
+
+    async def _send_signup_verification(self, profile_data: UserProfileData) -> None:
+        """Generate and email the verification code for a new user."""
+        try:
+            otp_code = await self.generate_email_verification_otp(
+                profile_data.user_id, profile_data.email
+            )
+            await self.send_verification_email(
+                email=profile_data.email,
+                otp_code=otp_code,
+                user_name=profile_data.display_name,
+            )
+            logger.info(f"Verification email sent to {profile_data.email}")
+        except Exception as e:
+            logger.warning(
+                f"Failed to send verification email to {profile_data.email}: {str(e)}"
+            )
+
     async def get_user_preferences(self, user_id: str) -> Dict[str, Any]:
         """Retrieve user preferences.
 
@@ -219,44 +420,61 @@ class UserProfileService:
         """
         logger.info(f"Retrieving preferences for user: {user_id}")
 
+        cached = self._preferences_cache.get(user_id)
+        if cached is not None:
+            return dict(cached)
+
+        return await self._single_flight(
+            self._inflight_preferences,
+            user_id,
+            lambda: self._fetch_user_preferences(user_id),
+        )
+
+    async def _fetch_user_preferences(self, user_id: str) -> Dict[str, Any]:
+        """Read user preferences from Supabase and cache them.
+
+        Args:
+            user_id: Supabase user ID
+
+        Returns:
+            User preferences dictionary
+        """
+        generation = self._cache_generation(user_id)
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/rest/v1/user_preferences",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    params={"user_id": f"eq.{user_id}"},
-                )
+            client = self.get_client()
+            response = await client.get(
+                USER_PREFERENCES_PATH,
+                params={
+                    "user_id": f"eq.{user_id}",
+                    "select": PREFERENCES_COLUMNS,
+                    "limit": 1,
+                },
+            )
 
-                if response.status_code not in (200, 201, 204):
-                    error_detail = "Failed to retrieve user preferences"
-                    try:
-                        error_data = response.json()
-                        if "message" in error_data:
-                            error_detail = error_data["message"]
-                    except Exception:
-                        pass
+            if not response.is_success:
+                error_detail = _error_detail(
+                    response, "Failed to retrieve user preferences"
+                )
 
-                    logger.error(f"Preferences retrieval failed: {error_detail}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Failed to retrieve user preferences",
-                    )
+                logger.error(f"Preferences retrieval failed: {error_detail}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to retrieve user preferences",
+                )
 
-                preferences_data = response.json()
-                if not preferences_data:
-                    return {
-                        "user_id": user_id,
-                        "calorie_target": 0,
-                        "protein_target": 0,
-                        "carbs_target": 0,
-                        "fat_target": 0,
-                    }
+            preferences_data = response.json()
+            if not preferences_data:
+                return {
+                    "user_id": user_id,
+                    "calorie_target": 0,
+                    "protein_target": 0,
+                    "carbs_target": 0,
+                    "fat_target": 0,
+                }
 
-                return preferences_data[0]
+            if self._cache_generation(user_id) == generation:
+                self._preferences_cache.set(user_id, preferences_data[0])
+            return preferences_data[0]
 
         except httpx.RequestError as e:
             logger.error(f"Request error retrieving preferences: {str(e)}")
@@ -286,11 +504,10 @@ class UserProfileService:
         logger.info(f"Retrieving profile for user: {user_id}")
 
         try:
-            # Get the basic profile
-            profile_data = await self._get_basic_profile(user_id)
-
-            # Get user preferences to include unit preference
-            user_preferences = await self.get_user_preferences(user_id)
+            # Get the basic profile and the preferences (for macro targets) at once
+            profile_data, user_preferences = await asyncio.gather(
+                self._get_basic_profile(user_id), self.get_user_preferences(user_id)
+            )
 
             # Check if calorie_target exists and update has_macros if needed
             if (
@@ -319,7 +536,7 @@ class UserProfileService:
                         profile_data["weight"] * KG_TO_LBS, 2
                     )
 
-            return UserProfile(**profile_data)
+            return UserProfile.model_validate(profile_data)
 
         except httpx.RequestError as e:
             logger.error(f"Request error retrieving profile: {str(e)}")
@@ -352,7 +569,10 @@ class UserProfileService:
         logger.info(f"Updating profile for user: {user_id}")
 
         try:
-            user_profile = remove_null_values(user_data.model_dump())
+            user_profile = user_data.model_dump(exclude_none=True)
+            if not user_profile:
+                # nothing to change; serve the current (usually cached) profile
+                return await self.get_user_profile(user_id)
 
             # Convert user input to metric units for database storage
             if "height" in user_profile.keys():
@@ -375,35 +595,25 @@ class UserProfileService:
                         user_profile["weight"] * LBS_TO_KG, 2
                     )
 
-            async with httpx.AsyncClient() as client:
-                response = await client.patch(
-                    f"{self.base_url}/rest/v1/user_profiles",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "Prefer": "return=representation",
-                    },
-                    params={"id": f"eq.{user_id}"},
-                    json=user_profile,
-                )
+            client = self.get_client()
+            response = await client.patch(
+                USER_PROFILES_PATH,
+                headers=RETURN_REPRESENTATION,
+                params={"id": f"eq.{user_id}", "select": PROFILE_COLUMNS},
+                content=orjson.dumps(user_profile),
+            )
 
-                if response.status_code not in (200, 201, 204):
-                    error_detail = "Failed to update user profile"
-                    try:
-                        error_data = response.json()
-                        if "message" in error_data:
-                            error_detail = error_data["message"]
-                    except Exception:
-                        pass
+            if not response.is_success:
+                error_detail = _error_detail(response, "Failed to update user profile")
 
-                    logger.error(f"Update profile failed: {error_detail}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Failed to update user profile",
-                    )
-                response_data = response.json()[0]
-                return UserProfile(**response_data)
+                logger.error(f"Update profile failed: {error_detail}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to update user profile",
+                )
+            self.invalidate_user_cache(user_id)
+            response_data = response.json()[0]
+            return UserProfile.model_validate(response_data)
 
         except httpx.RequestError as e:
             logger.error(f"Error communicating with database: {str(e)}")
@@ -419,13 +629,13 @@ class UserProfileService:
             )
 
     async def upload_user_avatar(
-        self, user_id: str, file_content: bytes, content_type: str
+        self, user_id: str, file_stream: BinaryIO, content_type: str
     ) -> Optional[str]:
         """Upload user avatar to supabase bucket.
 
         Args:
             user_id: Supabase user ID
-            file_content: image (bytes) to upload
+            file_stream: image file object to upload, streamed in chunks
             content_type: content type (image)
 
         Returns:
@@ -445,39 +655,28 @@ class UserProfileService:
         file_path = generate_avatar_path(user_id, file_extension)
 
         # Upload using the generalized function
-        return await upload_file_to_bucket(file_content, file_path, content_type)
+        return await upload_file_to_bucket(file_stream, file_path, content_type)
 
     async def update_user_auth_email(
         self, token: str, user_id: str, email: str
     ) -> Optional[str]:
         try:
             logger.info(f"updating auth details for user:{user_id}:{email}")
-            async with httpx.AsyncClient() as client:
-                response = await client.put(
-                    f"{settings.SUPABASE_URL}/auth/v1/admin/users/{user_id}",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={"email": email},
-                )
+            client = self.get_client()
+            response = await client.put(
+                f"{AUTH_ADMIN_USERS_PATH}/{user_id}",
+                content=orjson.dumps({"email": email}),
+            )
 
-                if response.status_code not in (200, 201, 204):
-                    error_detail = "Failed to update auth details"
-                    try:
-                        error_data = response.json()
-                        if "message" in error_data:
-                            error_detail = error_data["message"]
-                    except Exception:
-                        pass
+            if not response.is_success:
+                error_detail = _error_detail(response, "Failed to update auth details")
 
-                    logger.error(f"Updating user details failed: {error_detail}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Failed to update user auth details: {error_detail}",
-                    )
-                return "success"
+                logger.error(f"Updating user details failed: {error_detail}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to update user auth details: {error_detail}",
+                )
+            return "success"
 
         except httpx.RequestError as e:
             logger.error(f"Request error updating user auth details: {str(e)}")
@@ -505,35 +704,25 @@ class UserProfileService:
         logger.info(f"Updating FCM token for user: {user_id}")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.patch(
-                    f"{self.base_url}/rest/v1/user_profiles",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "Prefer": "return=representation",
-                    },
-                    params={"id": f"eq.{user_id}"},
-                    json={"fcm_token": fcm_token},
-                )
+            client = self.get_client()
+            response = await client.patch(
+                USER_PROFILES_PATH,
+                headers=RETURN_MINIMAL,
+                params={"id": f"eq.{user_id}"},
+                content=orjson.dumps({"fcm_token": fcm_token}),
+            )
 
-                if response.status_code not in (200, 201, 204):
-                    error_detail = "Failed to update FCM token"
-                    try:
-                        error_data = response.json()
-                        if "message" in error_data:
-                            error_detail = error_data["message"]
-                    except Exception:
-                        pass
+            if not response.is_success:
+                error_detail = _error_detail(response, "Failed to update FCM token")
 
-                    logger.error(f"Updating FCM token failed: {error_detail}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Failed to update FCM token",
-                    )
+                logger.error(f"Updating FCM token failed: {error_detail}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to update FCM token",
+                )
 
-                logger.info(f"FCM token updated successfully for user: {user_id}")
+            self.invalidate_user_cache(user_id)
+            logger.info(f"FCM token updated successfully for user: {user_id}")
 
         except httpx.RequestError as e:
             logger.error(f"Request error updating FCM token: {str(e)}")
@@ -560,35 +749,25 @@ class UserProfileService:
         logger.info(f"Marking trial as used for user: {user_id}")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.patch(
-                    f"{self.base_url}/rest/v1/user_profiles",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "Prefer": "return=representation",
-                    },
-                    params={"id": f"eq.{user_id}"},
-                    json={"has_used_trial": True},
-                )
+            client = self.get_client()
+            response = await client.patch(
+                USER_PROFILES_PATH,
+                headers=RETURN_MINIMAL,
+                params={"id": f"eq.{user_id}"},
+                content=orjson.dumps({"has_used_trial": True}),
+            )
 
-                if response.status_code not in (200, 201, 204):
-                    error_detail = "Failed to update trial status"
-                    try:
-                        error_data = response.json()
-                        if "message" in error_data:
-                            error_detail = error_data["message"]
-                    except Exception:
-                        pass
+            if not response.is_success:
+                error_detail = _error_detail(response, "Failed to update trial status")
 
-                    logger.error(f"Updating trial status failed: {error_detail}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Failed to update trial status",
-                    )
+                logger.error(f"Updating trial status failed: {error_detail}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to update trial status",
+                )
 
-                logger.info(f"Trial status updated successfully for user: {user_id}")
+            self.invalidate_user_cache(user_id)
+            logger.info(f"Trial status updated successfully for user: {user_id}")
 
         except httpx.RequestError as e:
             logger.error(f"Request error updating trial status: {str(e)}")
@@ -608,35 +787,24 @@ class UserProfileService:
         logger.info(f"Updating password for user: {email}")
 
         try:
-            async with httpx.AsyncClient() as client:
-                user = await self.get_user_by_email(email=email)
-                user_id = user.get("id") if user else None
-                response = await client.put(
-                    f"{settings.SUPABASE_URL}/auth/v1/admin/users/{user_id}",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={"password": password},
-                )
+            client = self.get_client()
+            user = await self.get_user_by_email(email=email)
+            user_id = user.get("id") if user else None
+            response = await client.put(
+                f"{AUTH_ADMIN_USERS_PATH}/{user_id}",
+                content=orjson.dumps({"password": password}),
+            )
 
-                if response.status_code not in (200, 204):
-                    error_detail = "Failed to update password"
-                    try:
-                        error_data = response.json()
-                        if "message" in error_data:
-                            error_detail = error_data["message"]
-                    except Exception:
-                        pass
+            if not response.is_success:
+                error_detail = _error_detail(response, "Failed to update password")
 
-                    logger.error(f"Password update failed for {email}: {error_detail}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Failed to update password",
-                    )
+                logger.error(f"Password update failed for {email}: {error_detail}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to update password",
+                )
 
-                logger.info(f"Password updated successfully for user: {email}")
+            logger.info(f"Password updated successfully for user: {email}")
 
         except httpx.RequestError as e:
             logger.error(f"Request error updating password: {str(e)}")
@@ -656,35 +824,26 @@ class UserProfileService:
         logger.info(f"Invalidating session token for user: {email}")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.delete(
-                    f"{self.base_url}/rest/v1/session_tokens",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    params={"email": f"eq.{email}"},
-                )
+            client = self.get_client()
+            response = await client.delete(
+                SESSION_TOKENS_PATH,
+                params={"email": f"eq.{email}"},
+            )
 
-                if response.status_code not in (200, 204):
-                    error_detail = "Failed to invalidate session token"
-                    try:
-                        error_data = response.json()
-                        if "message" in error_data:
-                            error_detail = error_data["message"]
-                    except Exception:
-                        pass
+            if not response.is_success:
+                error_detail = _error_detail(
+                    response, "Failed to invalidate session token"
+                )
 
-                    logger.error(
-                        f"Session token invalidation failed for {email}: {error_detail}"
-                    )
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Failed to invalidate session token",
-                    )
+                logger.error(
+                    f"Session token invalidation failed for {email}: {error_detail}"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to invalidate session token",
+                )
 
-                logger.info(f"Session token invalidated successfully for user: {email}")
+            logger.info(f"Session token invalidated successfully for user: {email}")
 
         except httpx.RequestError as e:
             logger.error(f"Request error invalidating session token: {str(e)}")
@@ -704,34 +863,23 @@ class UserProfileService:
         logger.info(f"Retrieving OTP for user: {email}")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/rest/v1/otp",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    params={"email": f"eq.{email}"},
-                )
+            client = self.get_client()
+            response = await client.get(
+                OTP_PATH,
+                params={"email": f"eq.{email}", "select": OTP_COLUMNS, "limit": 1},
+            )
 
-                if response.status_code not in (200, 204):
-                    error_detail = "Failed to retrieve OTP"
-                    try:
-                        error_data = response.json()
-                        if "message" in error_data:
-                            error_detail = error_data["message"]
-                    except Exception:
-                        pass
+            if not response.is_success:
+                error_detail = _error_detail(response, "Failed to retrieve OTP")
 
-                    logger.error(f"OTP retrieval failed for {email}: {error_detail}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Failed to retrieve OTP",
-                    )
+                logger.error(f"OTP retrieval failed for {email}: {error_detail}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to retrieve OTP",
+                )
 
-                otp_data = response.json()
-                return otp_data[0] if otp_data else None
+            otp_data = response.json()
+            return otp_data[0] if otp_data else None
 
         except httpx.RequestError as e:
             logger.error(f"Request error retrieving OTP: {str(e)}")
@@ -757,77 +905,54 @@ class UserProfileService:
                 "created_at": datetime.now().isoformat(),
             }
 
-            async with httpx.AsyncClient() as client:
-                # First check if a token already exists for this email
-                check_response = await client.get(
-                    f"{self.base_url}/rest/v1/session_tokens",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
+            client = self.get_client()
+            # First check if a token already exists for this email
+            check_response = await client.get(
+                SESSION_TOKENS_PATH,
+                params={"email": f"eq.{email}"},
+            )
+
+            if check_response.status_code == 200 and check_response.json():
+                # Token exists, update it
+                update_response = await client.patch(
+                    SESSION_TOKENS_PATH,
+                    headers=RETURN_MINIMAL,
                     params={"email": f"eq.{email}"},
+                    content=orjson.dumps(session_data),
                 )
 
-                if check_response.status_code == 200 and check_response.json():
-                    # Token exists, update it
-                    update_response = await client.patch(
-                        f"{self.base_url}/rest/v1/session_tokens",
-                        headers={
-                            "apikey": self.api_key,
-                            "Authorization": f"Bearer {self.api_key}",
-                            "Content-Type": "application/json",
-                            "Prefer": "return=representation",
-                        },
-                        params={"email": f"eq.{email}"},
-                        json=session_data,
+                if not update_response.is_success:
+                    error_detail = _error_detail(
+                        update_response, "Failed to update session token"
                     )
 
-                    if update_response.status_code not in (200, 204):
-                        error_detail = "Failed to update session token"
-                        try:
-                            error_data = update_response.json()
-                            if "message" in error_data:
-                                error_detail = error_data["message"]
-                        except Exception:
-                            pass
-
-                        logger.error(
-                            f"Session token update failed for {email}: {error_detail}"
-                        )
-                        raise HTTPException(
-                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail=f"Failed to update session token",
-                        )
-                else:
-                    # No token exists, create a new one
-                    create_response = await client.post(
-                        f"{self.base_url}/rest/v1/session_tokens",
-                        headers={
-                            "apikey": self.api_key,
-                            "Authorization": f"Bearer {self.api_key}",
-                            "Content-Type": "application/json",
-                            "Prefer": "return=representation",
-                        },
-                        json=session_data,
+                    logger.error(
+                        f"Session token update failed for {email}: {error_detail}"
+                    )
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail=f"Failed to update session token",
                     )
+            else:
+                # No token exists, create a new one
+                create_response = await client.post(
+                    SESSION_TOKENS_PATH,
+                    headers=RETURN_MINIMAL,
+                    content=orjson.dumps(session_data),
+                )
 
-                    if create_response.status_code not in (201, 200):
-                        error_detail = "Failed to store session token"
-                        try:
-                            error_data = create_response.json()
-                            if "message" in error_data:
-                                error_detail = error_data["message"]
-                        except Exception:
-                            pass
+                if not create_response.is_success:
+                    error_detail = _error_detail(
+                        create_response, "Failed to store session token"
+                    )
 
-                        logger.error(
-                            f"Session token storage failed for {email}: {error_detail}"
-                        )
-                        raise HTTPException(
-                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail=f"Failed to store session token",
-                        )
+                    logger.error(
+                        f"Session token storage failed for {email}: {error_detail}"
+                    )
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail=f"Failed to store session token",
+                    )
 
             logger.info(f"Session token stored successfully for user: {email}")
 
@@ -860,26 +985,25 @@ class UserProfileService:
         logger.info(f"Retrieving user with email: {email}")
 
         try:
-            async with httpx.AsyncClient() as client:
-                # Check user_profiles table for the user
-                response = await client.get(
-                    f"{self.base_url}/rest/v1/user_profiles",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    params={"email": f"eq.{email}"},
-                )
+            client = self.get_client()
+            # Check user_profiles table for the user
+            response = await client.get(
+                USER_PROFILES_PATH,
+                params={
+                    "email": f"eq.{email}",
+                    "select": PROFILE_COLUMNS,
+                    "limit": 1,
+                },
+            )
 
-                if response.status_code == 200:
-                    profiles = response.json()
-                    if profiles and len(profiles) > 0:
-                        return profiles[0]
+            if response.status_code == 200:
+                profiles = response.json()
+                if profiles and len(profiles) > 0:
+                    return profiles[0]
 
-                # User not found
-                logger.info(f"No user found with email: {email}")
-                return None
+            # User not found
+            logger.info(f"No user found with email: {email}")
+            return None
 
         except httpx.RequestError as e:
             logger.error(f"Request error retrieving user: {str(e)}")
@@ -918,59 +1042,44 @@ class UserProfileService:
                 "created_at": datetime.now().isoformat(),
             }
 
-            async with httpx.AsyncClient() as client:
-                # First check if an OTP already exists for this email
-                check_response = await client.get(
-                    f"{self.base_url}/rest/v1/otp",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
+            client = self.get_client()
+            # First check if an OTP already exists for this email
+            check_response = await client.get(
+                OTP_PATH,
+                params={"email": f"eq.{email}"},
+            )
+
+            if check_response.status_code == 200 and check_response.json():
+                # OTP exists, update it
+                update_response = await client.patch(
+                    OTP_PATH,
+                    headers=RETURN_MINIMAL,
                     params={"email": f"eq.{email}"},
+                    content=orjson.dumps(otp_data),
                 )
 
-                if check_response.status_code == 200 and check_response.json():
-                    # OTP exists, update it
-                    update_response = await client.patch(
-                        f"{self.base_url}/rest/v1/otp",
-                        headers={
-                            "apikey": self.api_key,
-                            "Authorization": f"Bearer {self.api_key}",
-                            "Content-Type": "application/json",
-                            "Prefer": "return=representation",
-                        },
-                        params={"email": f"eq.{email}"},
-                        json=otp_data,
+                if not update_response.is_success:
+                    logger.error(f"Failed to update OTP for {email}")
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail=f"Failed to update OTP",
                     )
+            else:
+                # No OTP exists, create a new one
+                create_response = await client.post(
+                    OTP_PATH,
+                    headers=RETURN_MINIMAL,
+                    content=orjson.dumps(otp_data),
+                )
 
-                    if update_response.status_code not in (200, 204):
-                        logger.error(f"Failed to update OTP for {email}")
-                        raise HTTPException(
-                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail=f"Failed to update OTP",
-                        )
-                else:
-                    # No OTP exists, create a new one
-                    create_response = await client.post(
-                        f"{self.base_url}/rest/v1/otp",
-                        headers={
-                            "apikey": self.api_key,
-                            "Authorization": f"Bearer {self.api_key}",
-                            "Content-Type": "application/json",
-                            "Prefer": "return=representation",
-                        },
-                        json=otp_data,
+                if not create_response.is_success:
+                    logger.error(f"Failed to create OTP for {email}")
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail=f"Failed to create OTP",
                     )
 
-                    if create_response.status_code not in (201, 200):
-                        logger.error(f"Failed to create OTP for {email}")
-                        raise HTTPException(
-                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail=f"Failed to create OTP",
-                        )
-
-                logger.info(f"OTP stored successfully for user: {email}")
+            logger.info(f"OTP stored successfully for user: {email}")
 
         except httpx.RequestError as e:
             logger.error(f"Request error storing OTP: {str(e)}")
@@ -1001,21 +1110,16 @@ class UserProfileService:
         logger.info(f"Retrieving session token for user: {email}")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/rest/v1/session_tokens",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    params={"email": f"eq.{email}"},
-                )
+            client = self.get_client()
+            response = await client.get(
+                SESSION_TOKENS_PATH,
+                params={"email": f"eq.{email}"},
+            )
 
-                if response.status_code == 200:
-                    tokens = response.json()
-                    if tokens and len(tokens) > 0:
-                        return tokens[0]
+            if response.status_code == 200:
+                tokens = response.json()
+                if tokens and len(tokens) > 0:
+                    return tokens[0]
 
             # No token found
             logger.info(f"No session token found for user: {email}")
@@ -1047,31 +1151,22 @@ class UserProfileService:
         logger.info(f"Invalidating OTP for user: {email}")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.delete(
-                    f"{self.base_url}/rest/v1/otp",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    params={"email": f"eq.{email}"},
-                )
+            client = self.get_client()
+            response = await client.delete(
+                OTP_PATH,
+                params={"email": f"eq.{email}"},
+            )
 
-                if response.status_code not in (200, 204):
-                    error_detail = "Unknown error"
-                    try:
-                        error_detail = response.json().get("message", "Unknown error")
-                    except:
-                        pass
+            if not response.is_success:
+                error_detail = _error_detail(response, "Unknown error")
 
-                    logger.error(f"OTP invalidation failed for {email}: {error_detail}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Failed to invalidate OTP",
-                    )
+                logger.error(f"OTP invalidation failed for {email}: {error_detail}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to invalidate OTP",
+                )
 
-                logger.info(f"OTP invalidated successfully for user: {email}")
+            logger.info(f"OTP invalidated successfully for user: {email}")
 
         except httpx.RequestError as e:
             logger.error(f"Request error invalidating OTP: {str(e)}")
@@ -1223,24 +1318,19 @@ class UserProfileService:
                 return False
 
             # Update user as verified
-            async with httpx.AsyncClient() as client:
-                update_response = await client.patch(
-                    f"{self.base_url}/rest/v1/user_profiles",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    params={"email": f"eq.{email}"},
-                    json={"email_verified": True},
-                )
+            client = self.get_client()
+            update_response = await client.patch(
+                USER_PROFILES_PATH,
+                params={"email": f"eq.{email}"},
+                content=orjson.dumps({"email_verified": True}),
+            )
 
-                if update_response.status_code not in (200, 204):
-                    logger.error(f"Failed to update user verification status: {email}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Failed to complete email verification",
-                    )
+            if not update_response.is_success:
+                logger.error(f"Failed to update user verification status: {email}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to complete email verification",
+                )
 
             # Invalidate the OTP after successful verification
             await self.invalidate_otp(email)
@@ -1271,34 +1361,58 @@ class UserProfileService:
         """
         logger.info(f"Retrieving basic profile for user: {user_id}")
 
+        cached = self._profile_cache.get(user_id)
+        if cached is not None:
+            return dict(cached)
+
+        return await self._single_flight(
+            self._inflight_profiles,
+            user_id,
+            lambda: self._fetch_basic_profile(user_id),
+        )
+
+    async def _fetch_basic_profile(self, user_id: str) -> Dict[str, Any]:
+        """Read the basic user profile from Supabase and cache it if verified.
+
+        Args:
+            user_id: Supabase user ID
+
+        Returns:
+            Basic user profile data
+        """
+        generation = self._cache_generation(user_id)
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/rest/v1/user_profiles",
-                    headers={
-                        "apikey": self.api_key,
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    params={"id": f"eq.{user_id}"},
-                )
+            client = self.get_client()
+            response = await client.get(
+                USER_PROFILES_PATH,
+                params={
+                    "id": f"eq.{user_id}",
+                    "select": PROFILE_COLUMNS,
+                    "limit": 1,
+                },
+            )
 
-                if response.status_code not in (200, 201, 204):
-                    error_detail = "Failed to retrieve user profile"
-                    try:
-                        error_data = response.json()
-                        if "message" in error_data:
-                            error_detail = error_data["message"]
-                    except Exception:
-                        pass
+            if not response.is_success:
+                error_detail = _error_detail(
+                    response, "Failed to retrieve user profile"
+                )
 
-                    logger.error(f"Profile retrieval failed: {error_detail}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Failed to retrieve user profile",
-                    )
+                logger.error(f"Profile retrieval failed: {error_detail}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to retrieve user profile",
+                )
 
-                return response.json()[0]
+            profile = response.json()[0]
+            # unverified profiles are re-read so a verification completed on
+            # another worker is seen immediately by auth_guard; rows read across
+            # an invalidation may predate the write and are not cached either
+            if (
+                profile.get("email_verified")
+                and self._cache_generation(user_id) == generation
+            ):
+                self._profile_cache.set(user_id, profile)
+            return profile
 
         except httpx.RequestError as e:
             logger.error(f"Request error retrieving profile: {str(e)}")
@@ -1339,23 +1453,19 @@ class UserProfileService:
             profile_data["has_macros"] = True
 
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.patch(
-                        f"{self.base_url}/rest/v1/user_profiles",
-                        headers={
-                            "apikey": self.api_key,
-                            "Authorization": f"Bearer {self.api_key}",
-                            "Content-Type": "application/json",
-                            "Prefer": "return=representation",
-                        },
-                        params={"id": f"eq.{user_id}"},
-                        json={"has_macros": True},
-                    )
+                client = self.get_client()
+                response = await client.patch(
+                    USER_PROFILES_PATH,
+                    headers=RETURN_MINIMAL,
+                    params={"id": f"eq.{user_id}"},
+                    content=orjson.dumps({"has_macros": True}),
+                )
+                self.invalidate_user_cache(user_id)
 
-                    if response.status_code not in (200, 201):
-                        logger.warning(
-                            f"Failed to update has_macros for user {user_id}"
-                        )
+                if not response.is_success:
+                    logger.warning(
+                        f"Failed to update has_macros for user {user_id}"
+                    )
 
             except Exception as e:
                 logger.warning(
@@ -1399,93 +1509,84 @@ class UserProfileService:
 
             deletion_results = {}
 
-            async with httpx.AsyncClient() as client:
-                for table in tables_to_delete:
-                    try:
-                        logger.info(f"Deleting user data from table: {table}")
-
-                        if table == "user_profiles":
-                            params = {"id": f"eq.{user_id}"}
-                        else:
-                            params = {"user_id": f"eq.{user_id}"}
-
-                        response = await client.delete(
-                            f"{self.base_url}/rest/v1/{table}",
-                            headers={
-                                "apikey": self.api_key,
-                                "Authorization": f"Bearer {self.api_key}",
-                                "Content-Type": "application/json",
-                                "Prefer": "return=representation",
-                            },
-                            params=params,
-                        )
-
-                        if response.status_code in (200, 204):
-                            deleted_records = (
-                                response.json() if response.content else []
-                            )
-                            record_count = (
-                                len(deleted_records)
-                                if isinstance(deleted_records, list)
-                                else 0
-                            )
-                            deletion_results[table] = record_count
-                            logger.info(
-                                f"Successfully deleted {record_count} records from {table}"
-                            )
-                        elif response.status_code == 404:
-                            # Table might not exist or no records found
-                            deletion_results[table] = 0
-                            logger.info(
-                                f"No records found in {table} for user {user_id}"
-                            )
-                        else:
-                            logger.error(
-                                f"Failed to delete from {table}: {response.status_code} - {response.text}"
-                            )
-                            deletion_results[table] = "failed"
-
-                    except Exception as e:
-                        logger.error(f"Error deleting from table {table}: {str(e)}")
-                        deletion_results[table] = "error"
-
-                # Delete user from Supabase Auth (this removes login capability)
+            client = self.get_client()
+            for table in tables_to_delete:
                 try:
-                    logger.info(
-                        f"CRITICAL STEP: Deleting user from Supabase Auth: {user_id}"
-                    )
+                    logger.info(f"Deleting user data from table: {table}")
+
+                    if table == "user_profiles":
+                        params = {"id": f"eq.{user_id}"}
+                    else:
+                        params = {"user_id": f"eq.{user_id}"}
 
-                    auth_response = await client.delete(
-                        f"{self.base_url}/auth/v1/admin/users/{user_id}",
-                        headers={
-                            "apikey": self.api_key,
-                            "Authorization": f"Bearer {self.api_key}",
-                            "Content-Type": "application/json",
-                        },
+                    response = await client.delete(
+                        f"{REST_PATH}/{table}",
+                        headers=RETURN_REPRESENTATION,
+                        params=params,
                     )
 
-                    if auth_response.status_code in (200, 204):
+                    if response.is_success:
+                        deleted_records = (
+                            response.json() if response.content else []
+                        )
+                        record_count = (
+                            len(deleted_records)
+                            if isinstance(deleted_records, list)
+                            else 0
+                        )
+                        deletion_results[table] = record_count
                         logger.info(
-                            f"✅ SUCCESS: Auth user deleted from Supabase: {user_id}"
+                            f"Successfully deleted {record_count} records from {table}"
                         )
-                        deletion_results["auth_user"] = "deleted"
-                    elif auth_response.status_code == 404:
+                    elif response.status_code == 404:
+                        # Table might not exist or no records found
+                        deletion_results[table] = 0
                         logger.info(
-                            f"Auth user {user_id} not found (may have been deleted already)"
+                            f"No records found in {table} for user {user_id}"
                         )
-                        deletion_results["auth_user"] = "not_found"
                     else:
                         logger.error(
-                            f"❌ FAILED: Auth user deletion failed - {auth_response.status_code}: {auth_response.text}"
+                            f"Failed to delete from {table}: {response.status_code} - {response.text}"
                         )
-                        deletion_results["auth_user"] = "failed"
+                        deletion_results[table] = "failed"
 
                 except Exception as e:
+                    logger.error(f"Error deleting from table {table}: {str(e)}")
+                    deletion_results[table] = "error"
+
+            # Delete user from Supabase Auth (this removes login capability)
+            try:
+                logger.info(
+                    f"CRITICAL STEP: Deleting user from Supabase Auth: {user_id}"
+                )
+
+                auth_response = await client.delete(
+                    f"{AUTH_ADMIN_USERS_PATH}/{user_id}",
+                )
+
+                if auth_response.is_success:
+                    logger.info(
+                        f"✅ SUCCESS: Auth user deleted from Supabase: {user_id}"
+                    )
+                    deletion_results["auth_user"] = "deleted"
+                elif auth_response.status_code == 404:
+                    logger.info(
+                        f"Auth user {user_id} not found (may have been deleted already)"
+                    )
+                    deletion_results["auth_user"] = "not_found"
+                else:
                     logger.error(
-                        f"❌ ERROR: Exception during auth user deletion for {user_id}: {str(e)}"
+                        f"❌ FAILED: Auth user deletion failed - {auth_response.status_code}: {auth_response.text}"
                     )
-                    deletion_results["auth_user"] = "error"
+                    deletion_results["auth_user"] = "failed"
+
+            except Exception as e:
+                logger.error(
+                    f"❌ ERROR: Exception during auth user deletion for {user_id}: {str(e)}"
+                )
+                deletion_results["auth_user"] = "error"
 
+            self.invalidate_user_cache(user_id)
             logger.info(
                 f"Data deletion completed for user {user_id}. Results: {deletion_results}"
             )
@@ -1,6 +1,9 @@
 from app.worker import celery_app
 from app.services.restaurant_scraper_service import scraper_service
-from app.services.base_database_service import BaseDatabaseService
+from app.services.base_database_service import (
+    BaseDatabaseService,
+    get_database_service,
+)
 from app.services.location_service import location_service
 from app.utils.helper_functions import deduplicate_dict_list
 import logging
@@ -82,9 +85,11 @@ def scrape_restaurants_task(self, location_name, latitude, longitude):
         if bulk_restaurant_data:
             dedup_restaurants = deduplicate_dict_list(bulk_restaurant_data)
             logger.info(f"Inserting {len(dedup_restaurants)} restaurants into database")
-            BaseDatabaseService.subclasses[0]().insert_data(
-                table_name="restaurants", 
-                data=dedup_restaurants
+            asyncio.run(
+                get_database_service().insert_data(
+                    table_name="restaurants", 
+                    data=dedup_restaurants
+                )
             )
         else:
             logger.info("No restaurants to insert into database")
@@ -1,5 +1,6 @@
 import pytest
 from app.core.config import settings
+from app.services.stripe_service import StripeUnavailableError, WebhookStoreError
 from app.tests.constants.user import UserTestConstants
 import json
 
@@ -227,11 +228,40 @@ class TestBillingEndpoint:
         # assert stripe_service.create_customer_billing portal called
         mock_stripe_create_customer_billing_portal.assert_not_called()
 
+    async def test_create_customer_portal_session_stripe_unavailable(
+        self,
+        authenticated_client,
+        mock_stripe_get_customer,
+        mock_stripe_create_customer_billing_portal,
+    ):
+        """
+        Test case to verify that the /create-customer-portal-session endpoint
+        returns a 503 while the Stripe circuit breaker is open instead of a
+        generic 500.
+        """
+
+        mock_stripe_get_customer.return_value = UserTestConstants.MOCK_CUSTOMER_ID.value
+
+        mock_stripe_create_customer_billing_portal.side_effect = (
+            StripeUnavailableError("Stripe billing_portal is unavailable")
+        )
+
+        response = authenticated_client.post(
+            f"{settings.API_V1_STR}/billing/create-customer-portal-session",
+        )
+
+        assert response.status_code == 503
+
+        assert response.json() == {
+            "detail": "Billing is temporarily unavailable, please try again shortly"
+        }
+
     async def test_webhook_setup_intent_succeeded(
         self,
         authenticated_client,
         generate_stripe_signature_for_test,
         mock_stripe_verify_webhook_signature,
+        mock_stripe_record_webhook_event,
         mock_stripe_create_subscription,
         mock_stripe_get_customer_email,  # Add this fixture
         mock_mail_send_email,  # Add this fixture
@@ -287,7 +317,7 @@ class TestBillingEndpoint:
         assert response.status_code == 200
         assert response.json() == {
             "status": "success",
-            "message": "Setup intent and subscription creation completed succesfully",
+            "message": "Event evt_1PQRSampleSuccess00000000000 received",
         }
 
         # assert stripe_service.verify_webhook_signature called
@@ -317,6 +347,7 @@ class TestBillingEndpoint:
         authenticated_client,
         generate_stripe_signature_for_test,
         mock_stripe_verify_webhook_signature,
+        mock_stripe_record_webhook_event,
         mock_stripe_handle_checkout_completed,
         mock_mail_send_email,  # Add this fixture
     ):
@@ -366,7 +397,7 @@ class TestBillingEndpoint:
         assert response.status_code == 200
         assert response.json() == {
             "status": "success",
-            "message": "Checkout completed successfully",
+            "message": "Event evt_test_webhook_async received",
         }
 
         # assert stripe_service.verify_webhook_signature called
@@ -391,6 +422,7 @@ class TestBillingEndpoint:
         authenticated_client,
         generate_stripe_signature_for_test,
         mock_stripe_verify_webhook_signature,
+        mock_stripe_record_webhook_event,
         mock_stripe_update_user_subscription,
     ):
         """
@@ -450,7 +482,7 @@ class TestBillingEndpoint:
         assert response.status_code == 200
         assert response.json() == {
             "status": "success",
-            "message": "Subscription renewed",
+            "message": "Event evt_test_webhook_async received",
         }
 
         # assert stripe_service.verify_webhook_signature called
@@ -464,6 +496,7 @@ class TestBillingEndpoint:
         authenticated_client,
         generate_stripe_signature_for_test,
         mock_stripe_verify_webhook_signature,
+        mock_stripe_record_webhook_event,
         mock_stripe_update_user_subscription,
         mock_stripe_get_customer_email,  # Add this fixture
         mock_mail_send_email,  # Add this fixture
@@ -515,7 +548,7 @@ class TestBillingEndpoint:
         assert response.status_code == 200
         assert response.json() == {
             "status": "success",
-            "message": "Subscription cancelled successfully",
+            "message": "Event evt_1PQRDeletedEventMinimal received",
         }
 
         # assert stripe_service.verify_webhook_signature called
@@ -539,3 +572,147 @@ class TestBillingEndpoint:
         assert "subscription_type" in kwargs["context"]
         assert kwargs["context"]["subscription_type"] == "Macro Meals Pro"
         assert "cancellation_date" in kwargs["context"]
+
+    async def test_webhook_duplicate_event_skipped(
+        self,
+        authenticated_client,
+        generate_stripe_signature_for_test,
+        mock_stripe_verify_webhook_signature,
+        mock_stripe_claim_webhook_event,
+        mock_stripe_update_user_subscription,
+    ):
+        """
+        Test case to verify that the webhook handler skips an event that has
+        already been claimed, without dispatching it again.
+        """
+        test_payload_dict = {
+            "id": "evt_1PQRDuplicateEvent",
+            "object": "event",
+            "created": 1716196000,
+            "type": "customer.subscription.deleted",
+            "data": {
+                "object": {
+                    "id": "sub_DuplicateSubscriptionID",
+                    "object": "subscription",
+                    "customer": UserTestConstants.MOCK_CUSTOMER_ID.value,
+                }
+            },
+        }
+
+        mock_stripe_verify_webhook_signature.return_value = test_payload_dict
+        mock_stripe_claim_webhook_event.return_value = False
+
+        response = authenticated_client.post(
+            f"{settings.API_V1_STR}/billing/webhook",
+            content=json.dumps(test_payload_dict).encode("utf-8"),
+            headers={
+                "Stripe-Signature": generate_stripe_signature_for_test,
+                "Content-Type": "application/json",
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "status": "success",
+            "message": "Event evt_1PQRDuplicateEvent already processed",
+        }
+
+        mock_stripe_claim_webhook_event.assert_called_once_with("evt_1PQRDuplicateEvent")
+        mock_stripe_update_user_subscription.assert_not_called()
+
+    async def test_webhook_not_acknowledged_when_event_not_recorded(
+        self,
+        authenticated_client,
+        generate_stripe_signature_for_test,
+        mock_stripe_verify_webhook_signature,
+        mock_stripe_claim_webhook_event,
+        mock_stripe_record_webhook_event,
+        mock_stripe_release_webhook_event,
+        mock_stripe_update_user_subscription,
+    ):
+        """
+        Test case to verify that the webhook handler answers with a 5xx, so
+        Stripe redelivers the event, and releases its claim when the event
+        could not be recorded for replay.
+        """
+        test_payload_dict = {
+            "id": "evt_1PQRUnrecordedEvent",
+            "object": "event",
+            "created": 1716196000,
+            "type": "customer.subscription.deleted",
+            "data": {
+                "object": {
+                    "id": "sub_UnrecordedSubscriptionID",
+                    "object": "subscription",
+                    "customer": UserTestConstants.MOCK_CUSTOMER_ID.value,
+                }
+            },
+        }
+
+        mock_stripe_verify_webhook_signature.return_value = test_payload_dict
+        mock_stripe_claim_webhook_event.return_value = True
+        mock_stripe_record_webhook_event.side_effect = WebhookStoreError(
+            "Failed to record webhook event"
+        )
+
+        response = authenticated_client.post(
+            f"{settings.API_V1_STR}/billing/webhook",
+            content=json.dumps(test_payload_dict).encode("utf-8"),
+            headers={
+                "Stripe-Signature": generate_stripe_signature_for_test,
+                "Content-Type": "application/json",
+            },
+        )
+
+        assert response.status_code == 503
+
+        mock_stripe_release_webhook_event.assert_awaited_once_with(
+            "evt_1PQRUnrecordedEvent"
+        )
+        mock_stripe_update_user_subscription.assert_not_called()
+
+    async def test_replayed_stale_subscription_event_not_dispatched(
+        self,
+        mock_stripe_is_stale_webhook_event,
+        mock_stripe_resolve_webhook_failure,
+        mock_stripe_record_webhook_failure,
+        mock_stripe_mark_webhook_event_processed,
+        mock_stripe_update_user_subscription,
+    ):
+        """
+        Test case to verify that a dead-lettered subscription event older than
+        one already handled is resolved on replay without being dispatched.
+        """
+        from app.api.endpoints.billing import process_stripe_event
+
+        event = {
+            "id": "evt_1PQROlderUpdatedEvent",
+            "object": "event",
+            "created": 1716195000,
+            "type": "customer.subscription.updated",
+            "data": {
+                "object": {
+                    "id": "sub_ReplayedSubscriptionID",
+                    "object": "subscription",
+                    "customer": UserTestConstants.MOCK_CUSTOMER_ID.value,
+                    "status": "active",
+                }
+            },
+        }
+        mock_stripe_is_stale_webhook_event.return_value = True
+
+        result = await process_stripe_event(event, attempts=2)
+
+        assert result == {
+            "status": "success",
+            "message": "Event evt_1PQROlderUpdatedEvent is stale",
+        }
+        mock_stripe_is_stale_webhook_event.assert_awaited_once_with(event)
+        mock_stripe_update_user_subscription.assert_not_called()
+        mock_stripe_record_webhook_failure.assert_not_called()
+        mock_stripe_resolve_webhook_failure.assert_awaited_once_with(
+            "evt_1PQROlderUpdatedEvent"
+        )
+        mock_stripe_mark_webhook_event_processed.assert_awaited_once_with(
+            "evt_1PQROlderUpdatedEvent"
+        )
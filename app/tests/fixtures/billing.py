@@ -146,3 +146,73 @@ def mock_mail_send_email(monkeypatch):
         "app.services.mail_service.mail_service.send_email", mock
     )
     return mock
+
+
+@pytest.fixture(scope="function")
+def mock_stripe_claim_webhook_event(mocker):
+    """Fixture to patch and provide a mock for stripe_service.claim_webhook_event."""
+    mock = mocker.patch(
+        "app.api.endpoints.billing.stripe_service.claim_webhook_event",
+        new_callable=AsyncMock,
+    )
+    return mock
+
+
+@pytest.fixture(scope="function")
+def mock_stripe_record_webhook_event(mocker):
+    """Fixture to patch and provide a mock for stripe_service.record_webhook_event."""
+    mock = mocker.patch(
+        "app.api.endpoints.billing.stripe_service.record_webhook_event",
+        new_callable=AsyncMock,
+    )
+    return mock
+
+
+@pytest.fixture(scope="function")
+def mock_stripe_release_webhook_event(mocker):
+    """Fixture to patch and provide a mock for stripe_service.release_webhook_event."""
+    mock = mocker.patch(
+        "app.api.endpoints.billing.stripe_service.release_webhook_event",
+        new_callable=AsyncMock,
+    )
+    return mock
+
+
+@pytest.fixture(scope="function")
+def mock_stripe_is_stale_webhook_event(mocker):
+    """Fixture to patch and provide a mock for stripe_service.is_stale_webhook_event."""
+    mock = mocker.patch(
+        "app.api.endpoints.billing.stripe_service.is_stale_webhook_event",
+        new_callable=AsyncMock,
+    )
+    return mock
+
+
+@pytest.fixture(scope="function")
+def mock_stripe_resolve_webhook_failure(mocker):
+    """Fixture to patch and provide a mock for stripe_service.resolve_webhook_failure."""
+    mock = mocker.patch(
+        "app.api.endpoints.billing.stripe_service.resolve_webhook_failure",
+        new_callable=AsyncMock,
+    )
+    return mock
+
+
+@pytest.fixture(scope="function")
+def mock_stripe_record_webhook_failure(mocker):
+    """Fixture to patch and provide a mock for stripe_service.record_webhook_failure."""
+    mock = mocker.patch(
+        "app.api.endpoints.billing.stripe_service.record_webhook_failure",
+        new_callable=AsyncMock,
+    )
+    return mock
+
+
+@pytest.fixture(scope="function")
+def mock_stripe_mark_webhook_event_processed(mocker):
+    """Fixture to patch and provide a mock for stripe_service.mark_webhook_event_processed."""
+    mock = mocker.patch(
+        "app.api.endpoints.billing.stripe_service.mark_webhook_event_processed",
+        new_callable=AsyncMock,
+    )
+    return mock
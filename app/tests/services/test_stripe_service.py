@@ -0,0 +1,153 @@
+import hashlib
+import hmac
+import json
+import time
+
+import httpx
+import pytest
+import stripe
+
+from app.services.stripe_service import (
+    WEBHOOK_EVENT_TTL,
+    stripe_service,
+    StripeServiceError,
+    StripeUnavailableError,
+    WebhookStoreError,
+)
+from app.services.user_service import user_service
+from app.utils.circuit_breaker import CircuitBreaker
+
+
+def _sign(payload: bytes, secret: str, timestamp: int) -> str:
+    """Build a Stripe-Signature header for the given payload."""
+    digest = hmac.new(
+        secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256
+    ).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+class TestWebhookSignature:
+
+    payload = json.dumps(
+        {"id": "evt_test", "object": "event", "type": "invoice.paid"}
+    ).encode("utf-8")
+
+    @pytest.fixture(autouse=True)
+    def webhook_secrets(self, monkeypatch):
+        monkeypatch.setattr(
+            stripe_service, "webhook_secrets", ["whsec_old", "whsec_new"]
+        )
+
+    def test_verify_with_any_configured_secret(self):
+        """Test that a payload signed with any configured secret is accepted."""
+        for secret in ("whsec_old", "whsec_new"):
+            header = _sign(self.payload, secret, int(time.time()))
+            event = stripe_service.verify_webhook_signature(self.payload, header)
+            assert event["id"] == "evt_test"
+
+    @pytest.mark.parametrize(
+        "header",
+        [
+            _sign(payload, "whsec_unknown", int(time.time())),
+            _sign(payload, "whsec_new", int(time.time()) - 3600),
+            "not-a-signature",
+        ],
+    )
+    def test_verify_rejects_invalid_signature(self, header):
+        """Test that unknown secrets, stale timestamps and bad headers are rejected."""
+        with pytest.raises(StripeServiceError):
+            stripe_service.verify_webhook_signature(self.payload, header)
+
+
+class TestStripeCircuitBreaker:
+
+    @pytest.fixture(autouse=True)
+    def breakers(self, monkeypatch):
+        monkeypatch.setattr(
+            stripe_service,
+            "_breakers",
+            {
+                "customer": CircuitBreaker(
+                    "stripe:customer",
+                    fail_max=2,
+                    reset_timeout=30,
+                    failure_exceptions=(stripe.APIConnectionError,),
+                )
+            },
+        )
+
+    async def test_open_circuit_fails_fast(self, mocker):
+        """Test that calls are rejected without reaching Stripe once the breaker opens."""
+        method = mocker.AsyncMock(side_effect=stripe.APIConnectionError("down"))
+
+        for _ in range(2):
+            with pytest.raises(stripe.APIConnectionError):
+                await stripe_service._stripe_call("customer", method, "cus_123")
+
+        with pytest.raises(StripeUnavailableError):
+            await stripe_service._stripe_call("customer", method, "cus_123")
+        assert method.await_count == 2
+
+    async def test_client_errors_do_not_open_circuit(self, mocker):
+        """Test that Stripe errors other than outages leave the breaker closed."""
+        method = mocker.AsyncMock(side_effect=stripe.InvalidRequestError("bad", None))
+
+        for _ in range(3):
+            with pytest.raises(stripe.InvalidRequestError):
+                await stripe_service._stripe_call("customer", method, "cus_123")
+        assert method.await_count == 3
+
+
+class TestWebhookSchemaCheck:
+
+    @pytest.fixture
+    def client(self, mocker):
+        client = mocker.Mock()
+        client.get = mocker.AsyncMock()
+        mocker.patch.object(user_service, "get_client", return_value=client)
+        return client
+
+    async def test_missing_columns_raise(self, client):
+        """Test that a table lacking the bookkeeping columns fails the check."""
+        client.get.return_value = httpx.Response(
+            400, json={"code": "42703", "message": "column does not exist"}
+        )
+
+        with pytest.raises(WebhookStoreError):
+            await stripe_service.check_webhook_schema()
+
+    async def test_unreachable_supabase_is_tolerated(self, client):
+        """Test that the check does not fail startup when Supabase is unreachable."""
+        client.get.side_effect = httpx.ConnectError("unreachable")
+
+        await stripe_service.check_webhook_schema()
+
+
+class TestWebhookOrdering:
+
+    event = {
+        "id": "evt_test",
+        "type": "customer.subscription.updated",
+        "created": 1716196000,
+        "data": {"object": {"id": "sub_test"}},
+    }
+
+    async def test_check_and_record_is_one_script_call(self, mocker):
+        """Test that the staleness check and the new event time go through one atomic script."""
+        script = mocker.AsyncMock(return_value=1)
+        mocker.patch.object(stripe_service, "_record_subscription_event", script)
+
+        assert await stripe_service.is_stale_webhook_event(self.event) is True
+        script.assert_awaited_once_with(
+            keys=["stripe:sub:sub_test:last_event"],
+            args=[1716196000, WEBHOOK_EVENT_TTL],
+        )
+
+    async def test_other_events_are_never_stale(self, mocker):
+        """Test that events other than customer.subscription.* skip the ordering check."""
+        script = mocker.AsyncMock()
+        mocker.patch.object(stripe_service, "_record_subscription_event", script)
+
+        event = {**self.event, "type": "invoice.paid"}
+        assert await stripe_service.is_stale_webhook_event(event) is False
+        script.assert_not_awaited()
@@ -0,0 +1,126 @@
+import httpx
+import pytest
+
+from app.services.supabase_service import SupabaseService, SupabaseException
+
+
+@pytest.fixture
+def service(mocker):
+    """SupabaseService whose client returns a mocked request for every query."""
+    service = SupabaseService()
+    client = mocker.MagicMock()
+    request = mocker.MagicMock()
+    request.execute = mocker.AsyncMock()
+    select = client.table.return_value.select.return_value
+    select.match.return_value = request
+    select.order.return_value.range.return_value = request
+    client.table.return_value.insert.return_value = request
+    client.table.return_value.delete.return_value.in_.return_value = request
+    client.rpc.return_value = request
+    mocker.patch.object(service, "_get_client", mocker.AsyncMock(return_value=client))
+    mocker.patch.object(service, "_reset_client", mocker.AsyncMock())
+    service.request = request
+    return service
+
+
+class TestTransientErrorRetry:
+
+    async def test_select_retries_and_reconnects(self, service, mocker):
+        """Test that a dropped connection is retried on a fresh client."""
+        service.request.execute.side_effect = [
+            httpx.ReadError("connection reset"),
+            mocker.MagicMock(data=[{"id": "123"}]),
+        ]
+
+        result = await service.select_data("user_profiles", cols={"id": "123"})
+
+        assert result == [{"id": "123"}]
+        assert service.request.execute.await_count == 2
+        service._reset_client.assert_awaited_once()
+
+    async def test_insert_not_retried_after_request_was_sent(self, service):
+        """Test that inserts are not repeated when the server may have applied them."""
+        service.request.execute.side_effect = httpx.ReadError("connection reset")
+
+        with pytest.raises(SupabaseException):
+            await service.insert_data("restaurants", {"name": "test"})
+
+        assert service.request.execute.await_count == 1
+
+
+class TestDeleteMany:
+
+    async def test_deletes_all_values_in_one_request(self, service):
+        """Test that every value is deleted through a single in_ filter."""
+        service.request.execute.return_value.data = [{"id": "1"}, {"id": "2"}]
+
+        result = await service.delete_many("meal_logs", "id", ["1", "2"])
+
+        assert result["data"] == [{"id": "1"}, {"id": "2"}]
+        service.request.execute.assert_awaited_once()
+        client = await service._get_client()
+        client.table.return_value.delete.return_value.in_.assert_called_once_with(
+            "id", ["1", "2"]
+        )
+
+    async def test_no_values_skips_request(self, service):
+        """Test that an empty value list does not reach Supabase."""
+        result = await service.delete_many("meal_logs", "id", [])
+
+        assert result["data"] == []
+        service.request.execute.assert_not_awaited()
+
+
+class TestSelectStream:
+
+    async def test_yields_every_page_until_a_short_one(self, service, mocker):
+        """Test that pages are fetched in turn until a partial page arrives."""
+        service.request.execute.side_effect = [
+            mocker.MagicMock(data=[{"id": 1}, {"id": 2}]),
+            mocker.MagicMock(data=[{"id": 3}]),
+        ]
+
+        rows = [
+            row async for row in service.select_stream("restaurants", page_size=2)
+        ]
+
+        assert rows == [{"id": 1}, {"id": 2}, {"id": 3}]
+        client = await service._get_client()
+        ordered = client.table.return_value.select.return_value.order
+        ordered.assert_called_with("id")
+        assert [c.args for c in ordered.return_value.range.call_args_list] == [
+            (0, 1),
+            (2, 3),
+        ]
+
+
+class TestRpcCache:
+
+    async def test_empty_result_not_cached(self, service):
+        """Test that an empty rpc result is fetched again instead of served from cache."""
+        service.request.execute.return_value.data = []
+
+        for _ in range(2):
+            assert await service.rpc("empty_rpc", {"lat": 1.0}, cache=True) == []
+
+        assert service.request.execute.await_count == 2
+
+    async def test_result_cached(self, service):
+        """Test that a non-empty rpc result is served from cache on the next call."""
+        service.request.execute.return_value.data = [{"id": "1"}]
+
+        for _ in range(2):
+            assert await service.rpc("cached_rpc", {"lat": 1.0}, cache=True) == [
+                {"id": "1"}
+            ]
+
+        service.request.execute.assert_awaited_once()
+
+    async def test_unhashable_params_skip_cache(self, service):
+        """Test that list params are passed through uncached instead of failing."""
+        service.request.execute.return_value.data = [{"id": "1"}]
+
+        for _ in range(2):
+            await service.rpc("list_rpc", {"ids": ["1", "2"]}, cache=True)
+
+        assert service.request.execute.await_count == 2
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from app.models.user import UpdateUserProfileRequest
+from app.services.user_service import user_service
+
+
+@pytest.fixture
+def profile_response(mocker):
+    """Patch the shared HTTP client so profile reads return the given row."""
+
+    def _patch(row):
+        response = mocker.MagicMock(status_code=200, is_success=True)
+        response.json.return_value = [row]
+        client = mocker.MagicMock()
+        client.get = mocker.AsyncMock(return_value=response)
+        mocker.patch.object(user_service, "get_client", return_value=client)
+        user_service.invalidate_user_cache()
+        return client
+
+    yield _patch
+    user_service.invalidate_user_cache()
+
+
+class TestProfileCache:
+
+    async def test_verified_profile_is_cached_until_invalidated(
+        self, profile_response
+    ):
+        """Test that repeated reads are served from cache until the user changes."""
+        client = profile_response({"id": "user-1", "email_verified": True})
+
+        first = await user_service._get_basic_profile("user-1")
+        first["email_verified"] = False
+        second = await user_service._get_basic_profile("user-1")
+
+        assert second["email_verified"] is True
+        assert client.get.await_count == 1
+
+        user_service.invalidate_user_cache("user-1")
+        await user_service._get_basic_profile("user-1")
+        assert client.get.await_count == 2
+
+    async def test_unverified_profile_is_not_cached(self, profile_response):
+        """Test that unverified profiles are re-read so verification shows up at once."""
+        client = profile_response({"id": "user-1", "email_verified": False})
+
+        await user_service._get_basic_profile("user-1")
+        await user_service._get_basic_profile("user-1")
+
+        assert client.get.await_count == 2
+
+    async def test_concurrent_reads_share_one_request(self, profile_response):
+        """Test that simultaneous reads for one user trigger a single GET."""
+        client = profile_response({"id": "user-1", "email_verified": False})
+
+        first, second = await asyncio.gather(
+            user_service._get_basic_profile("user-1"),
+            user_service._get_basic_profile("user-1"),
+        )
+
+        assert first == second == {"id": "user-1", "email_verified": False}
+        assert first is not second
+        assert client.get.await_count == 1
+
+    async def test_read_in_flight_during_invalidation_is_not_cached(
+        self, profile_response
+    ):
+        """Test that a row fetched across an invalidation is not put back in cache."""
+        client = profile_response({"user_id": "user-1", "calorie_target": 1800})
+        response = client.get.return_value
+        release = asyncio.Event()
+
+        async def slow_get(*args, **kwargs):
+            await release.wait()
+            return response
+
+        client.get.side_effect = slow_get
+
+        read = asyncio.create_task(user_service.get_user_preferences("user-1"))
+        while not client.get.called:
+            await asyncio.sleep(0)
+        user_service.invalidate_user_cache("user-1")
+        release.set()
+        await read
+
+        await user_service.get_user_preferences("user-1")
+        assert client.get.await_count == 2
+
+
+class TestUpdateUserProfile:
+
+    async def test_empty_update_skips_patch(self, mocker):
+        """Test that an update with no fields returns the profile without a PATCH."""
+        client = mocker.MagicMock()
+        mocker.patch.object(user_service, "get_client", return_value=client)
+        get_profile = mocker.patch.object(user_service, "get_user_profile")
+
+        result = await user_service.update_user_profile(
+            "user-1", UpdateUserProfileRequest()
+        )
+
+        assert result is get_profile.return_value
+        get_profile.assert_awaited_once_with("user-1")
+        client.patch.assert_not_called()
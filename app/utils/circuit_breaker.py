@@ -0,0 +1,108 @@
+"""Async circuit breaker for calls to external services.
+
+After ``fail_max`` consecutive failures the breaker opens and rejects calls
+immediately with CircuitBreakerError. Once ``reset_timeout`` seconds have
+passed a single trial call is let through (half-open); its outcome closes
+the breaker again or re-opens it for another cooldown.
+"""
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreakerError(Exception):
+    """Raised when a call is rejected because the breaker is open."""
+
+    pass
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for coroutine functions."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        fail_max: int = 5,
+        reset_timeout: float = 30.0,
+        failure_exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+    ):
+        """
+        Args:
+            name: Label used in log messages
+            fail_max: Consecutive failures that open the breaker
+            reset_timeout: Seconds to stay open before allowing a trial call
+            failure_exceptions: Exception types counted as failures; anything
+                else propagates without affecting the breaker
+        """
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.failure_exceptions = failure_exceptions
+        self._state = self.CLOSED
+        self._fail_count = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self) -> str:
+        """Current breaker state, moving from open to half-open after the cooldown."""
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = self.HALF_OPEN
+        return self._state
+
+    async def call(
+        self, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Await func(*args, **kwargs) through the breaker.
+
+        Raises:
+            CircuitBreakerError: If the breaker is open, or half-open with a
+                trial call already in flight
+        """
+        state = self.state
+        if state == self.OPEN:
+            raise CircuitBreakerError(f"Circuit '{self.name}' is open")
+        if state == self.HALF_OPEN:
+            # only one trial call at a time; others keep failing fast
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+        try:
+            result = await func(*args, **kwargs)
+        except self.failure_exceptions:
+            self._record_failure()
+            raise
+        except Exception:
+            # the service answered, just not successfully for this request
+            self._record_success()
+            raise
+
+        self._record_success()
+        return result
+
+    def _record_failure(self) -> None:
+        self._fail_count += 1
+        if self._fail_count >= self.fail_max or self._state != self.CLOSED:
+            if self._state == self.CLOSED:
+                logger.warning(
+                    "Circuit '%s' opened after %s consecutive failures",
+                    self.name,
+                    self._fail_count,
+                )
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def _record_success(self) -> None:
+        if self._state != self.CLOSED:
+            logger.info("Circuit '%s' closed", self.name)
+        self._state = self.CLOSED
+        self._fail_count = 0
@@ -3,9 +3,12 @@
 This module provides reusable functions for uploading files to AWS S3 buckets.
 """
 
+import asyncio
+import io
 import logging
-from typing import Optional
+from typing import BinaryIO, Optional, Union
 import boto3
+from boto3.exceptions import S3UploadFailedError
 from botocore.exceptions import ClientError, NoCredentialsError
 from fastapi import HTTPException, status
 from app.core.config import settings
@@ -14,14 +17,16 @@ logger = logging.getLogger(__name__)
 
 
 async def upload_file_to_s3(
-    file_content: bytes,
+    file_content: Union[bytes, BinaryIO],
     file_path: str,
     content_type: str,
 ) -> str:
     """Upload a file to S3 bucket.
 
+    File objects are streamed to S3 in chunks rather than read into memory.
+
     Args:
-        file_content: File content as bytes
+        file_content: File content as bytes, or a readable binary file object
         file_path: Path within the bucket (e.g., "avatars/user_id/avatar.png" or "meals/user_id/meal_123.jpg")
         content_type: MIME type of the file (e.g., "image/jpeg", "image/png")
 
@@ -54,12 +59,16 @@ async def upload_file_to_s3(
             region_name=settings.AWS_REGION
         )
 
-        # Upload file to S3
-        s3_client.put_object(
-            Bucket=settings.S3_MEDIA_NAME,
-            Key=file_path,
-            Body=file_content,
-            ContentType=content_type
+        if isinstance(file_content, (bytes, bytearray)):
+            file_content = io.BytesIO(file_content)
+
+        # Stream file to S3 off the event loop
+        await asyncio.to_thread(
+            s3_client.upload_fileobj,
+            file_content,
+            settings.S3_MEDIA_NAME,
+            file_path,
+            ExtraArgs={"ContentType": content_type},
         )
 
         # Generate public URL
@@ -74,6 +83,12 @@ async def upload_file_to_s3(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="AWS credentials not configured properly",
         )
+    except S3UploadFailedError as e:
+        logger.error(f"S3 upload failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to upload file to S3",
+        )
     except ClientError as e:
         error_code = e.response['Error']['Code']
         error_message = e.response['Error']['Message']
@@ -92,7 +107,7 @@ async def upload_file_to_s3(
 
 # Legacy function for backward compatibility - redirects to S3
 async def upload_file_to_bucket(
-    file_content: bytes,
+    file_content: Union[bytes, BinaryIO],
     file_path: str,
     content_type: str,
     bucket_name: Optional[str] = None
@@ -100,7 +115,7 @@ async def upload_file_to_bucket(
     """Legacy function that redirects to S3 upload.
     
     Args:
-        file_content: File content as bytes
+        file_content: File content as bytes, or a readable binary file object
         file_path: Path within the bucket
         content_type: MIME type of the file
         bucket_name: Ignored (uses S3_MEDIA_NAME from settings)
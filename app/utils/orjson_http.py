@@ -0,0 +1,30 @@
+"""httpx transport that decodes JSON response bodies with orjson.
+
+Clients built on OrjsonTransport keep calling ``response.json()`` as usual;
+the body is parsed by orjson instead of the stdlib json module.
+"""
+
+from typing import Any
+
+import httpx
+import orjson
+
+
+class OrjsonResponse(httpx.Response):
+    """httpx response that decodes JSON bodies with orjson."""
+
+    def json(self, **kwargs: Any) -> Any:
+        return orjson.loads(self.content)
+
+
+class OrjsonTransport(httpx.AsyncHTTPTransport):
+    """Transport returning OrjsonResponse, so JSON bodies parse in C."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await super().handle_async_request(request)
+        return OrjsonResponse(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=response.stream,
+            extensions=response.extensions,
+        )
@@ -0,0 +1,29 @@
+"""Per-request memo for database reads.
+
+RequestCacheMiddleware gives every request an empty dict in
+``request_query_cache``; the database service stores select results in it so
+repeated reads of the same rows within one request skip the round trip. The
+memo is dropped when the request finishes, so it never serves stale data
+across requests.
+"""
+
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+request_query_cache: ContextVar[Optional[Dict[tuple, Any]]] = ContextVar(
+    "request_query_cache", default=None
+)
+
+
+class RequestCacheMiddleware(BaseHTTPMiddleware):
+    """Middleware that scopes a fresh read memo to each request."""
+
+    async def dispatch(self, request: Request, call_next):
+        token = request_query_cache.set({})
+        try:
+            return await call_next(request)
+        finally:
+            request_query_cache.reset(token)
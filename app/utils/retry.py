@@ -0,0 +1,60 @@
+"""Retry helper for coroutine calls that can fail transiently.
+
+Waits between attempts use full jitter: a random delay between zero and an
+exponentially growing cap, so callers failing together do not retry in lockstep.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+async def retry_async(
+    func: Callable[[], Awaitable[Any]],
+    *,
+    retry_on: Callable[[Exception], bool],
+    max_retries: int = 3,
+    base_delay: float = 0.1,
+    max_delay: float = 2.0,
+    before_retry: Optional[Callable[[Exception], Awaitable[None]]] = None,
+) -> Any:
+    """Await func(), retrying while retry_on(error) is true.
+
+    Args:
+        func: Zero-argument coroutine function performing one attempt
+        retry_on: Returns True for errors worth another attempt
+        max_retries: Retries after the first attempt before giving up
+        base_delay: Cap of the first wait in seconds, doubled per retry
+        max_delay: Upper bound for the wait cap in seconds
+        before_retry: Awaited with the error before waiting, e.g. to reset a
+            broken connection
+
+    Returns:
+        The result of the first successful attempt
+
+    Raises:
+        Exception: The last error once retries are exhausted, or the first
+            error retry_on rejects
+    """
+    attempt = 0
+    while True:
+        try:
+            return await func()
+        except Exception as e:
+            if attempt >= max_retries or not retry_on(e):
+                raise
+            if before_retry is not None:
+                await before_retry(e)
+            delay = random.uniform(0, min(max_delay, base_delay * 2**attempt))
+            attempt += 1
+            logger.warning(
+                "Transient error (%s), retry %s/%s in %.2fs",
+                type(e).__name__,
+                attempt,
+                max_retries,
+                delay,
+            )
+            await asyncio.sleep(delay)